@@ -1,31 +1,42 @@
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import os
+from threading import Event
+import time
+from urllib.parse import urlparse
 
 from requests import ConnectionError
 
 from mixins.base import Base
+from mixins.cache import ResponseCache
 from mixins.colour import Colour
+from mixins.gate import DownloadGate
+from mixins.store import ResultStore
+from mixins.transport import Transport
 from plugins.analysis import Analysis
+from plugins.canonical import URLCanonicalizer
 from plugins.crawler import Crawler
+from plugins.links import new_extractor
 from utils import strings
 
 
 class Aranea(Base, Colour, Analysis, Crawler):
 
-    def __init__(self, url, threads, headers, strict, mainonly=False, continuous=False, output=None, auto=False, html_output=None, no_log=''):
-        super().__init__(url, threads, headers, strict, mainonly, continuous, output, auto, html_output, no_log)
+    def __init__(self, url, threads, headers, strict, mainonly=False, continuous=False, output=None, auto=False, html_output=None, no_log='', engine='thread', path_rules=None, ignore_files=None, cache_dir=None, cache_ttl=0, no_cache=False, db=None, resume=False, visited_fp_rate=None, visited_memory=None, canonicalize=None, html_parser='stdlib', skip_types=None, max_page_size=None):
+        super().__init__(url, threads, headers, strict, mainonly, continuous, output, auto, html_output, no_log, engine, path_rules, ignore_files, cache_dir, cache_ttl, no_cache, db, resume, visited_fp_rate, visited_memory, canonicalize, html_parser, skip_types, max_page_size)
 
     @staticmethod
     def parse_args():
         parser = argparse.ArgumentParser()
-        url_group = parser.add_mutually_exclusive_group(required=True)
+        url_group = parser.add_mutually_exclusive_group()
         url_group.add_argument(
             '-u', '--url', help="Target URL")
         url_group.add_argument(
             '-ul', '--urllist', help="Path to file containing list of URLs (one per line)")
         parser.add_argument(
             '-m', '--mode',
-            help="Available Modes: crawl, analysis",
-            required=True)
+            help="Available Modes: crawl, analysis")
         parser.add_argument(
             '-o', '--output',
             help='Output file to save analysis results (analysis mode only).')
@@ -59,27 +70,217 @@ class Aranea(Base, Colour, Analysis, Crawler):
             '--no',
             help='Exclude categories from output (e.g., --no assets,js,images,modules,json,ts)',
             default='')
-        return parser.parse_args()
+        parser.add_argument(
+            '--engine',
+            help='For crawl mode: "thread" (default) or "async" (requires aiohttp, -t sets the number of in-flight requests).',
+            choices=('thread', 'async'),
+            default='thread')
+        parser.add_argument(
+            '--path-rules',
+            help='For analysis mode: file with extra path categories ("Category: keyword, keyword" per line), checked before the built-in ones.')
+        parser.add_argument(
+            '--ignore-file',
+            help='For analysis mode: extra ignore list (one entry per line, "*" matches anything). Can be repeated.',
+            action='append',
+            dest='ignore_files')
+        parser.add_argument(
+            '--cache-dir',
+            help=f'Directory of the response cache (default: {ResponseCache.DIRECTORY}).')
+        parser.add_argument(
+            '--cache-ttl',
+            help='Seconds a cached response is used without revalidation. Default: 0 (always revalidate with ETag/Last-Modified).',
+            type=int,
+            default=0)
+        parser.add_argument(
+            '--no-cache',
+            help='Do not read or write the response cache.',
+            action='store_true')
+        parser.add_argument(
+            '--db',
+            help=f'Also store all results in an SQLite database (default: {ResultStore.DATABASE}).',
+            nargs='?',
+            const=ResultStore.DATABASE)
+        parser.add_argument(
+            '--resume',
+            help='For crawl mode: continue an interrupted crawl of the same target from its journal.',
+            action='store_true')
+        parser.add_argument(
+            '--visited-fp-rate',
+            help='For crawl mode: keep visited URLs in a Bloom filter with this false positive rate (e.g. 0.001) instead of exact fingerprints. Uses far less memory, but that share of new URLs is skipped.',
+            type=float)
+        parser.add_argument(
+            '--visited-max-mb',
+            help='For crawl mode: memory for visited URL fingerprints before they are moved to disk. Default: 512.',
+            type=int)
+        parser.add_argument(
+            '--canonicalize',
+            help=f'For crawl mode: URL canonicalization rules, comma separated, or "none". Default: {",".join(URLCanonicalizer.DEFAULT_RULES)} (also available: https).')
+        parser.add_argument(
+            '--html-parser',
+            help='How links are read from pages: "stdlib" (default, single pass), "lxml" (fastest, requires lxml) or "bs4" (BeautifulSoup tree, as before).',
+            choices=('stdlib', 'lxml', 'bs4'),
+            default='stdlib')
+        parser.add_argument(
+            '--skip-types',
+            help='For crawl mode: Content-Type prefixes whose body is not downloaded, comma separated, or "none" (also crawls URLs with binary extensions). Default: images, audio, video, fonts, PDFs, archives and executables.')
+        parser.add_argument(
+            '--max-page-size',
+            help=f'For crawl mode: KB read from each page, the rest is not downloaded. 0 for no limit. Default: {DownloadGate.MAX_SIZE >> 10}.',
+            type=int)
+        parser.add_argument(
+            '-p', '--parallel',
+            help='With -ul: number of targets processed at the same time, each with its own crawl state. Default: 1.',
+            type=int,
+            default=1)
+        parser.add_argument(
+            '--max-in-flight',
+            help='With --parallel: requests in flight over all targets together. Default: no limit besides -t per target.',
+            type=int)
+        parser.add_argument(
+            '--query',
+            help='Search the values stored with --db instead of scanning, e.g. --query /graphql')
+        parser.add_argument(
+            '--kind',
+            help='With --query: only one kind of result (paths, secrets, emails, ips, sinks, comments, objects, js, general, external, extracted, parametrized).')
+        args = parser.parse_args()
+        if args.query is None:
+            if not (args.url or args.urllist):
+                parser.error('one of the arguments -u/--url -ul/--urllist is required')
+            if not args.mode:
+                parser.error('the following arguments are required: -m/--mode')
+            try:
+                URLCanonicalizer.from_option(args.canonicalize)
+            except ValueError as e:
+                parser.error(str(e))
+            try:
+                DownloadGate.from_options(args.skip_types, args.max_page_size)
+            except ValueError as e:
+                parser.error(str(e))
+            try:
+                new_extractor(args.html_parser)
+            except ImportError as e:
+                parser.error(str(e))
+        return args
 
     @staticmethod
-    def run_on_url(url, mode, threads, headers, strict, mainonly, continuous, output, auto, html_output, no_log):
-        """Run the specified mode on a single URL"""
+    def run_on_url(url, mode, threads, headers, strict, mainonly, continuous, output, auto, html_output, no_log, engine='thread', path_rules=None, ignore_files=None, cache_dir=None, cache_ttl=0, no_cache=False, db=None, resume=False, visited_fp_rate=None, visited_memory=None, canonicalize=None, html_parser='stdlib', skip_types=None, max_page_size=None, running=None):
+        """Run the specified mode on a single URL, return False if it failed.
+
+        The Aranea instance is in the running set while it works.
+        """
+        if mode not in ('analysis', 'a', 'crawl', 'c'):
+            print(
+                f'{Aranea.RED} The mode "{mode}" does not exist!{Aranea.WHITE}')
+            return False
         try:
-            if mode in ('analysis', 'a'):
-                Aranea(url, threads, headers, strict, mainonly, continuous, output, auto, html_output, no_log).analyze()
-            elif mode in ('crawl', 'c'):
-                Aranea(url, threads, headers, strict, mainonly, continuous, output, auto, html_output, no_log).crawl()
-            else:
-                print(
-                    f'{Aranea.RED} The mode "{mode}" does not exist!{Aranea.WHITE}')
+            aranea = Aranea(url, threads, headers, strict, mainonly, continuous, output, auto, html_output, no_log, engine, path_rules, ignore_files, cache_dir, cache_ttl, no_cache, db, resume, visited_fp_rate, visited_memory, canonicalize, html_parser, skip_types, max_page_size)
+            if running is not None:
+                running.add(aranea)
+            try:
+                if mode in ('analysis', 'a'):
+                    aranea.analyze()
+                else:
+                    aranea.crawl()
+            finally:
+                if running is not None:
+                    running.discard(aranea)
+            return True
         except ConnectionError:
             print(f'{Aranea.RED} Connection Error: Please check the URL address and try again - {url}{Aranea.WHITE}')
         except Exception as e:
             print(f'{Aranea.RED}Error processing {url}: {e}{Aranea.WHITE}')
+        return False
+
+    @staticmethod
+    def run_parallel(urls, parallel, max_in_flight, mode, threads, *options):
+        """Run the mode on up to `parallel` URLs at a time, options are the remaining run_on_url arguments.
+
+        Every target has its own Aranea instance (frontier, visited URLs, log
+        files); they share the transport and with it the keep-alive
+        connections, the per-host limits and the max_in_flight budget, and
+        the analysis worker processes. Targets on the same host (e.g. its
+        http:// and https:// URL) write to the same scans/<domain>/ files,
+        so they run one after the other.
+        """
+        # Room for the host of each target and of the scripts it loads.
+        Transport.shared(threads, 2 * parallel, max_in_flight)
+        total = len(urls)
+        running = set()
+        stopping = Event()
+        finished = 0
+
+        def run(url):
+            nonlocal finished
+            start = time.monotonic()
+            # The crawler's print lock, so that lines of other targets are not mixed in.
+            with Aranea.LOCK:
+                print(f'{Aranea.CYAN}TARGET   :: started {url}{Aranea.WHITE}')
+            ok = Aranea.run_on_url(url, mode, threads, *options, running=running)
+            with Aranea.LOCK:
+                finished += 1
+                if stopping.is_set():
+                    status = f'{Aranea.YELLOW}stopped'
+                else:
+                    status = f'{Aranea.GREEN}done' if ok else f'{Aranea.RED}failed'
+                print(
+                    f'{Aranea.CYAN}TARGET   :: [{finished}/{total}] {status}{Aranea.CYAN} {url} '
+                    f'in {time.monotonic() - start:.1f}s, {len(running)} running{Aranea.WHITE}')
+
+        def run_group(group):
+            for url in group:
+                if stopping.is_set():
+                    break
+                run(url)
+
+        groups = {}
+        for url in urls:
+            groups.setdefault((urlparse(url).hostname or url).lower(), []).append(url)
+        executor = ThreadPoolExecutor(max_workers=parallel)
+        futures = [executor.submit(run_group, group) for group in groups.values()]
+        try:
+            for future in futures:
+                future.result()
+        except KeyboardInterrupt:
+            # Running crawls stop claiming URLs and keep their journal for --resume.
+            print(f'{Aranea.YELLOW}Interrupted, stopping {len(running)} running target(s){Aranea.WHITE}')
+            stopping.set()
+            for aranea in list(running):
+                aranea.frontier.stop()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    @staticmethod
+    def print_query(db, text, kind=None):
+        """Print the stored results whose value contains text"""
+        if not os.path.exists(db):
+            print(f'{Aranea.RED}Error: database not found: {db}{Aranea.WHITE}')
+            exit(1)
+        rows = ResultStore.query(db, text, kind)
+        for target, kind, category, value, source, seen in rows:
+            kind = f'{kind}/{category}' if category else kind
+            seen = datetime.fromtimestamp(seen).strftime('%Y-%m-%d %H:%M')
+            print(f'{Aranea.CYAN}{kind}{Aranea.WHITE} :: {Aranea.GREEN}{value}{Aranea.WHITE} :: {source or target} ({seen})')
+        print(f'\n{len(rows)} result(s)')
+
+    @staticmethod
+    def print_host_stats():
+        """Print per-host request statistics collected by the shared transport"""
+        stats = Transport.shared().limiter.stats()
+        if not stats:
+            return
+        print(f'\n{Aranea.CYAN}Host statistics\n---------------{Aranea.WHITE}')
+        for row in stats:
+            throttled = f'{Aranea.RED}{row["throttled"]}{Aranea.WHITE}' if row['throttled'] else '0'
+            print(
+                f'{row["host"]} :: requests {row["requests"]}, errors {row["errors"]}, '
+                f'throttled {throttled}, avg {row["avg_ms"]} ms, concurrency {row["limit"]}')
 
 
 if __name__ == '__main__':
     args = Aranea.parse_args()
+    if args.query is not None:
+        Aranea.print_query(args.db or ResultStore.DATABASE, args.query, args.kind)
+        exit(0)
     threads = int(args.threads)
     headers = args.headers.strip()
     mode = args.mode.strip()
@@ -90,6 +291,22 @@ if __name__ == '__main__':
     auto = args.auto
     html_output = args.html
     no_log = args.no
+    engine = args.engine
+    path_rules = args.path_rules
+    ignore_files = args.ignore_files
+    cache_dir = args.cache_dir
+    cache_ttl = args.cache_ttl
+    no_cache = args.no_cache
+    db = args.db
+    resume = args.resume
+    visited_fp_rate = args.visited_fp_rate
+    visited_memory = args.visited_max_mb << 20 if args.visited_max_mb else None
+    canonicalize = args.canonicalize
+    html_parser = args.html_parser
+    skip_types = args.skip_types
+    max_page_size = args.max_page_size
+    parallel = max(1, args.parallel)
+    max_in_flight = args.max_in_flight
 
     # Collect URLs from either single URL or URL list file
     urls = []
@@ -115,19 +332,33 @@ if __name__ == '__main__':
     print(strings.INTRO)
     print(strings.SOLID)
     
-    # Process each URL
     total_urls = len(urls)
-    for idx, url in enumerate(urls, 1):
-        if total_urls > 1:
-            print(f'\n{Aranea.CYAN}{"=" * 60}{Aranea.WHITE}')
-            print(f'{Aranea.CYAN}Processing URL {idx} of {total_urls}{Aranea.WHITE}')
-            print(f'{Aranea.CYAN}{"=" * 60}{Aranea.WHITE}\n')
+    if parallel > 1 and mode in ('analysis', 'a') and continuous and not auto:
+        print(f'{Aranea.YELLOW}Interactive analysis (--continuous without --auto) runs one target at a time.{Aranea.WHITE}')
+        parallel = 1
+    if parallel > 1 and total_urls > 1:
+        print(f'''
+URLs     :: {total_urls}
+Mode     :: {mode}
+Parallel :: {parallel}
+Threads  :: {threads}
+''')
+        Aranea.run_parallel(urls, parallel, max_in_flight, mode, threads, headers, strict, mainonly, continuous, output, auto, html_output, no_log, engine, path_rules, ignore_files, cache_dir, cache_ttl, no_cache, db, resume, visited_fp_rate, visited_memory, canonicalize, html_parser, skip_types, max_page_size)
+    else:
+        # Process each URL
+        for idx, url in enumerate(urls, 1):
+            if total_urls > 1:
+                print(f'\n{Aranea.CYAN}{"=" * 60}{Aranea.WHITE}')
+                print(f'{Aranea.CYAN}Processing URL {idx} of {total_urls}{Aranea.WHITE}')
+                print(f'{Aranea.CYAN}{"=" * 60}{Aranea.WHITE}\n')
         
-        banner = f'''
+            banner = f'''
 URL      :: {url}
 Mode     :: {mode}
 Threads  :: {threads}
 '''
-        print(banner)
+            print(banner)
         
-        Aranea.run_on_url(url, mode, threads, headers, strict, mainonly, continuous, output, auto, html_output, no_log)
+            Aranea.run_on_url(url, mode, threads, headers, strict, mainonly, continuous, output, auto, html_output, no_log, engine, path_rules, ignore_files, cache_dir, cache_ttl, no_cache, db, resume, visited_fp_rate, visited_memory, canonicalize, html_parser, skip_types, max_page_size)
+
+    Aranea.print_host_stats()
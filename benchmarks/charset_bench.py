@@ -0,0 +1,109 @@
+"""Compare requests' Response.text with mixins.charset on JS-like bodies.
+
+Response.text guesses the encoding of a body without a declared charset
+(charset_normalizer), decode() and decode_stream() do not. same=False
+marks bodies that Response.text decodes differently: text/* types
+without a charset default to ISO-8859-1 there, and guessing can pick
+another encoding. Run from the repository root:
+
+    python3 benchmarks/charset_bench.py [--sizes 100,1024,5120] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from mixins.charset import decode, decode_stream
+
+CONTENT_TYPES = (
+    'application/javascript', '', 'text/javascript', 'application/javascript; charset=utf-8')
+WORDS = (
+    'function', 'return', 'var', 'const', '"/api/v1/users"', "'Привет'", '"日本語"',
+    'fetch(', 'e.exports=', '{', '}', ';')
+CHUNK_SIZE = 1 << 16
+
+
+def js_body(size, seed=1):
+    """About size bytes of UTF-8 JS-like text, mostly ASCII."""
+    rng = random.Random(seed)
+    parts, n = [], 0
+    while n < size:
+        word = rng.choice(WORDS) + ''.join(rng.choices(string.ascii_letters, k=rng.randint(1, 12)))
+        parts.append(word)
+        n += len(word) + 1
+    return ' '.join(parts).encode('utf-8')
+
+
+def variants(body):
+    return {
+        'utf-8': body,
+        'utf-8, one bad byte per 64 KB': b''.join(
+            body[i:i + CHUNK_SIZE] + b'\xe9' for i in range(0, len(body), CHUNK_SIZE)),
+        # Every non-ASCII character becomes an \xe9, invalid as UTF-8.
+        'cp1252': body.decode('utf-8').encode('ascii', errors='replace').replace(b'?', b'\xe9')
+    }
+
+
+def response(body, content_type):
+    res = Response()
+    res._content = body
+    res._content_consumed = True
+    res.headers = CaseInsensitiveDict({'Content-Type': content_type} if content_type else {})
+    res.encoding = get_encoding_from_headers(res.headers)
+    return res
+
+
+def best_of(repeat, fn, body, content_type):
+    best, out = None, None
+    for _ in range(repeat):
+        res = response(body, content_type)
+        start = time.perf_counter()
+        out = fn(res)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
+
+
+def stream(res):
+    chunks = (res.content[i:i + CHUNK_SIZE] for i in range(0, len(res.content), CHUNK_SIZE))
+    return ''.join(decode_stream(chunks, res.headers))
+
+
+def row(label, body, content_type, repeat):
+    old, expected = best_of(repeat, lambda res: res.text, body, content_type)
+    new, text = best_of(repeat, lambda res: decode(res.content, res.headers), body, content_type)
+    streamed, text_streamed = best_of(repeat, stream, body, content_type)
+    print(
+        f'{len(body) >> 10:>7} KB  {label:42} .text {old * 1000:9.1f} ms  '
+        f'decode {new * 1000:7.2f} ms  decode_stream {streamed * 1000:7.2f} ms  '
+        f'same={text == expected and text_streamed == text}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', 1)[0])
+    parser.add_argument('--sizes', default='100,1024,5120', help='Body sizes in KB, comma separated.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement, the best is shown.')
+    args = parser.parse_args()
+    sizes = [int(size) << 10 for size in args.sizes.split(',')]
+
+    print('Content-Type')
+    for size in sizes:
+        body = js_body(size)
+        for content_type in CONTENT_TYPES:
+            row(content_type or '(none)', body, content_type, args.repeat)
+    print('\nBody encoding (application/javascript, no charset)')
+    for size in sizes:
+        for label, body in variants(js_body(size)).items():
+            row(label, body, 'application/javascript', args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Time a single-pass scan of a JS source against the split scan in worker processes.
+
+Shows from which size splitting a source over the process pool pays for
+its startup and the pickling of segments, which is what ScanStream.SPLIT_SIZE
+and Analysis.scanner_pool (no pool below 2 CPUs) are based on. Run from the
+repository root:
+
+    python3 benchmarks/split_bench.py bundle.js [--sizes 1,2,4,8,16] [--repeat 3]
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plugins.analysis import Analysis
+from plugins.scanner import usable_cpus
+
+CHUNK_SIZE = 1 << 16
+
+
+def scan(js, pool, split_size):
+    stream = Analysis.SCANNER.stream(pool, split_size)
+    strings = []
+    for i in range(0, len(js), CHUNK_SIZE):
+        strings.extend(stream.feed(js[i:i + CHUNK_SIZE]))
+    found, rest = stream.close()
+    return found, strings + rest
+
+
+def best_of(repeat, *args):
+    best, out = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = scan(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', 1)[0])
+    parser.add_argument('file', help='JS source, cut to each of the sizes.')
+    parser.add_argument('--sizes', default='1,2,4,8,16', help='Sizes in MB, comma separated.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement, the best is shown.')
+    args = parser.parse_args()
+    with open(args.file, encoding='utf-8', errors='replace') as f:
+        source = f.read()
+
+    cpus = usable_cpus()
+    start = time.perf_counter()
+    pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+    # Spawning the workers is paid once per run.
+    list(pool.map(len, [''] * cpus))
+    print(f'{cpus} usable CPU(s), pool startup {(time.perf_counter() - start) * 1000:.0f} ms\n')
+
+    with pool:
+        for size in (int(s) << 20 for s in args.sizes.split(',')):
+            js = source[:size]
+            if len(js) < size:
+                print(f'{size >> 20:>4} MB  skipped, the file is only {len(source) >> 20} MB')
+                continue
+            single, expected = best_of(args.repeat, js, None, len(js) + 1)
+            split, result = best_of(args.repeat, js, pool, 0)
+            same = result[1] == expected[1] and all(
+                sorted(result[0][k]) == sorted(v) for k, v in expected[0].items())
+            print(
+                f'{size >> 20:>4} MB  single pass {single * 1000:8.0f} ms  '
+                f'split {split * 1000:8.0f} ms  speedup {single / split:5.2f}x  same={same}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,25 +1,29 @@
-from collections import deque
 from urllib.parse import urljoin, urlparse
-from urllib3.exceptions import InsecureRequestWarning
 
-import requests
-from requests.exceptions import SSLError
+from mixins.cache import ResponseCache
+from mixins.charset import decode
+from mixins.frontier import Frontier
+from mixins.gate import DownloadGate
+from mixins.transport import Transport
+from mixins.visited import VisitedIndex
+from plugins.canonical import URLCanonicalizer
 
 
 class Base:
 
-    URLS = {
-        'internal': set(),
-        'external': set(),
-        'visited': set(),
-        'not_visited': deque([])
-    }
-
-    def __init__(self, url, threads, headers, strict, mainonly=False, continuous=False, output=None, auto=False, html_output=None, no_log=''):
+    def __init__(self, url, threads, headers, strict, mainonly=False, continuous=False, output=None, auto=False, html_output=None, no_log='', engine='thread', path_rules=None, ignore_files=None, cache_dir=None, cache_ttl=0, no_cache=False, db=None, resume=False, visited_fp_rate=None, visited_memory=None, canonicalize=None, html_parser='stdlib', skip_types=None, max_page_size=None):
         self.base = url
         self.threads = threads
+        self.transport = Transport.shared(threads)
+        self.cache_dir = cache_dir or ResponseCache.DIRECTORY
+        self.no_cache = no_cache
+        if not no_cache:
+            self.transport.ensure_cache(lambda: ResponseCache(self.cache_dir, cache_ttl))
         self.headers = self.__get_headers(headers)
-        self.domain = self.__get_domain(url)
+        self.canonicalizer = URLCanonicalizer.from_option(canonicalize)
+        self.html_parser = html_parser
+        self.gate = DownloadGate.from_options(skip_types, max_page_size)
+        self.domain = self.__get_domain(self._normalize_url(url))
         self.strict = strict
         self.mainonly = mainonly
         self.continuous = continuous
@@ -27,6 +31,14 @@ class Base:
         self.auto = auto
         self.html_output = html_output
         self.no_log = [x.strip().lower() for x in no_log.split(',')] if no_log else []
+        self.engine = engine
+        self.path_rules_file = path_rules
+        self.ignore_files = ignore_files or []
+        self.db = db
+        self.resume = resume
+        self.visited_fp_rate = visited_fp_rate
+        self.visited_memory = visited_memory
+        self.frontier = Frontier(self._new_index(), self._normalize_url)
         self._add_not_visited(url)
 
     def __get_domain(self, url):
@@ -43,29 +55,46 @@ class Base:
                 k.strip(): v.strip() for k, v in (
                     h.split(':') for h in headers.split(','))}
 
-    def _add_not_visited(self, url):
-        if (
-            url and url not in self.URLS['visited']
-                and url not in self.URLS['not_visited']):
-            self.URLS['not_visited'].append(url)
+    def _normalize_url(self, url):
+        """Canonical form of a URL, used for deduplication and in the logs."""
+        return self.canonicalizer(url)
 
-    def _add_visited(self):
-        url = self.URLS['not_visited'].popleft()
-        self.URLS['visited'].add(url)
-        if urlparse(url).netloc in self.domain:
-            self.URLS['internal'].add(url)
-        else:
-            self.URLS['external'].add(url)
-        return url
+    def _add_not_visited(self, url, source=None):
+        return self.frontier.add(url, source)
+
+    def _new_index(self):
+        """An empty VisitedIndex with the configured false positive rate and memory limit."""
+        return VisitedIndex(self.visited_fp_rate, self.visited_memory)
+
+    def _is_external(self, url):
+        return urlparse(url).netloc not in self.domain
 
     def _get_page_source(self, url):
-        requests.packages.urllib3.disable_warnings(
-            category=InsecureRequestWarning)
-        try:
-            return requests.get(url, headers=self.headers)
-        except SSLError:
-            return requests.get(
-                url, headers=self.headers, verify=False)
+        return self.transport.get(url, headers=self.headers)
+
+    def _get_page_text(self, url):
+        """Body of a page, decoded without charset detection (see mixins.charset)."""
+        res = self._get_page_source(url)
+        return decode(res.content, res.headers)
+
+    def _stream_page_source(self, url):
+        """Like _get_page_source, but the body is read on demand."""
+        return self.transport.get(url, headers=self.headers, stream=True)
+
+    def _fetch_page(self, url):
+        """(Content-Type, text) of a page to crawl, None if the download gate skips it."""
+        if self.gate.skip_url(url):
+            return None
+        res = self.transport.get(
+            url, headers=self.headers, stream=True,
+            accept=self.gate.accepts, limit=self.gate.max_size, binary=self.gate.is_binary)
+        with res:
+            if not self.gate.accepts(res.headers):
+                return None
+            body = self.gate.read(res)
+        if body is None:
+            return None
+        return res.headers.get('Content-Type', ''), decode(body, res.headers)
 
     def _process_path(self, url, path):
         if path.startswith('http'):
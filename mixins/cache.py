@@ -0,0 +1,231 @@
+import atexit
+from collections import Counter, OrderedDict
+import hashlib
+import json
+import os
+from threading import Lock
+import time
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+class ResponseCache:
+    """Persistent cache of successful GET responses.
+
+    Bodies are stored once per content hash under objects/, index.json maps
+    each request (a hash of the URL and request headers, which can hold
+    credentials) to its body, validators and response headers. Entries
+    younger than ttl seconds are served without a request, older ones are
+    revalidated with If-None-Match/If-Modified-Since and a 304 is answered
+    from disk. With ttl 0 a response without ETag or Last-Modified could
+    never be revalidated, so it is not stored. Least recently used entries
+    are evicted once the bodies exceed MAX_SIZE bytes or there are more
+    than MAX_ENTRIES of them.
+    """
+
+    DIRECTORY = 'scans/.cache'
+    MAX_SIZE = 512 << 20
+    # The index is held in memory.
+    MAX_ENTRIES = 20000
+    CHUNK_SIZE = 1 << 16
+    # Describe the stored body or the connection, not the resource, or are
+    # credentials.
+    SKIP_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection', 'set-cookie')
+
+    def __init__(self, directory, ttl=0):
+        self.directory = directory
+        self.ttl = ttl
+        self.index_file = os.path.join(directory, 'index.json')
+        self.lock = Lock()
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+        try:
+            with open(self.index_file, encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+        # Least recently used first.
+        self.entries = OrderedDict(sorted(entries.items(), key=lambda item: item[1]['accessed']))
+        # Entries with the same body share one object file.
+        self.refs = Counter(e['object'] for e in self.entries.values())
+        self.total = sum({e['object']: e['size'] for e in self.entries.values()}.values())
+        self.dirty = False
+        # Keys of older versions are the plain URL and headers.
+        for key in [k for k in self.entries if '\n' in k]:
+            self.__remove(key)
+        self.__evict()
+        atexit.register(self.save)
+
+    @staticmethod
+    def key(url, headers=None):
+        request = url + '\n' + json.dumps(sorted((headers or {}).items()))
+        return hashlib.sha256(request.encode('utf-8', errors='replace')).hexdigest()
+
+    def __object(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2], digest)
+
+    def lookup(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and not os.path.exists(self.__object(entry['object'])):
+                self.__remove(key)
+                entry = None
+            elif entry:
+                self.entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry):
+        return self.ttl > 0 and time.time() - entry['stored'] < self.ttl
+
+    def validators(self, entry):
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def cacheable(self, headers):
+        return self.ttl > 0 or bool(headers.get('ETag') or headers.get('Last-Modified'))
+
+    def response(self, entry, url, stream=False, revalidated=False):
+        """A requests.Response with the cached body, read lazily if stream.
+
+        None if the body was evicted since the entry was looked up.
+        """
+        with self.lock:
+            # Opened under the lock that eviction holds, an open body stays readable.
+            try:
+                body = open(self.__object(entry['object']), 'rb')
+            except FileNotFoundError:
+                return None
+            entry['accessed'] = time.time()
+            if revalidated:
+                entry['stored'] = entry['accessed']
+            self.dirty = True
+        return self.__response(entry, url, body, stream)
+
+    @staticmethod
+    def __response(entry, url, body, stream):
+        res = Response()
+        res.status_code = 200
+        res.reason = 'OK'
+        res.url = url
+        res.headers = CaseInsensitiveDict(entry['headers'])
+        res.encoding = get_encoding_from_headers(res.headers)
+        if stream:
+            res.raw = body
+        else:
+            with body:
+                res._content = body.read()
+            res._content_consumed = True
+        res.from_cache = True
+        return res
+
+    def store(self, key, url, res, stream=False, limit=None, binary=None):
+        """Save a 200 response, return a response to use in its place.
+
+        A streamed body longer than limit bytes, or whose first chunk
+        binary(headers, chunk) rejects, is not saved; the response returned
+        then holds what was read of it. A response that is not cacheable
+        is returned as it is, replacing what was stored for key.
+        """
+        if not self.cacheable(res.headers):
+            with self.lock:
+                if key in self.entries:
+                    self.__remove(key)
+            return res
+        digest = hashlib.sha256()
+        tmp = os.path.join(self.directory, f'objects/tmp-{os.getpid()}-{id(res)}')
+        complete = True
+        with open(tmp, 'w+b') as f:
+            if stream:
+                with res:
+                    for chunk in res.iter_content(self.CHUNK_SIZE):
+                        if binary and not f.tell() and binary(res.headers, chunk):
+                            f.write(chunk)
+                            complete = False
+                            break
+                        if limit and f.tell() + len(chunk) > limit:
+                            f.write(chunk[:limit - f.tell()])
+                            complete = False
+                            break
+                        digest.update(chunk)
+                        f.write(chunk)
+                if not complete:
+                    f.seek(0)
+                    res._content = f.read()
+                    res._content_consumed = True
+            elif binary and binary(res.headers, res.content[:self.CHUNK_SIZE]):
+                complete = False
+            else:
+                digest.update(res.content)
+                f.write(res.content)
+            size = f.tell()
+        if not complete:
+            os.remove(tmp)
+            return res
+        digest = digest.hexdigest()
+        path = self.__object(digest)
+        now = time.time()
+        entry = {
+            'url': url,
+            'object': digest,
+            'size': size,
+            'etag': res.headers.get('ETag'),
+            'last_modified': res.headers.get('Last-Modified'),
+            'headers': {
+                k: v for k, v in res.headers.items() if k.lower() not in self.SKIP_HEADERS},
+            'stored': now,
+            'accessed': now
+        }
+        body = None
+        with self.lock:
+            # Under the lock, so that releasing another entry with this body
+            # cannot remove the file in between.
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp, path)
+            if stream:
+                # Opened before the eviction below, which may drop this entry.
+                body = open(path, 'rb')
+            previous = self.entries.pop(key, None)
+            self.entries[key] = entry
+            if not self.refs[digest]:
+                self.total += size
+            self.refs[digest] += 1
+            # Released after the new entry took its reference, the body may be the same.
+            if previous:
+                self.__release(previous)
+            self.dirty = True
+            self.__evict()
+        return self.__response(entry, url, body, stream) if stream else res
+
+    def __release(self, entry):
+        digest = entry['object']
+        self.refs[digest] -= 1
+        if self.refs[digest] <= 0:
+            del self.refs[digest]
+            self.total -= entry['size']
+            try:
+                os.remove(self.__object(digest))
+            except OSError:
+                pass
+
+    def __remove(self, key):
+        self.__release(self.entries.pop(key))
+        self.dirty = True
+
+    def __evict(self):
+        while self.entries and (self.total > self.MAX_SIZE or len(self.entries) > self.MAX_ENTRIES):
+            self.__remove(next(iter(self.entries)))
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            tmp = self.index_file + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, self.index_file)
+            self.dirty = False
@@ -0,0 +1,60 @@
+import codecs
+
+
+# requests guesses the encoding of a body without a declared charset with
+# charset_normalizer, which on large bundles can take longer than the scan.
+# Here a byte order mark wins, then the Content-Type charset, then UTF-8;
+# invalid bytes are replaced in every case.
+DEFAULT_ENCODING = 'utf-8'
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'))
+
+
+def declared_charset(headers):
+    """Codec of the Content-Type charset parameter, None if it is missing or unknown."""
+    for param in (headers.get('Content-Type') or '').split(';')[1:]:
+        key, _, value = param.partition('=')
+        if key.strip().lower() == 'charset':
+            try:
+                return codecs.lookup(value.strip().strip('"\'')).name
+            except LookupError:
+                return None
+    return None
+
+
+def sniff(head, headers):
+    """(encoding, length of the BOM) of a body that starts with head."""
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding, len(bom)
+    return declared_charset(headers) or DEFAULT_ENCODING, 0
+
+
+def decode(body, headers):
+    encoding, skip = sniff(body[:3], headers)
+    return str(body[skip:], encoding, errors='replace')
+
+
+def decode_stream(chunks, headers):
+    """Decode an iterable of byte chunks like decode(), chunk by chunk."""
+    decoder, head = None, b''
+    for chunk in chunks:
+        if decoder is None:
+            head += chunk
+            if len(head) < 3:
+                continue
+            encoding, skip = sniff(head, headers)
+            decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+            chunk = head[skip:]
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    if decoder is None:
+        if head:
+            yield decode(head, headers)
+        return
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
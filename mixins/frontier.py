@@ -0,0 +1,100 @@
+from collections import deque
+from threading import Condition
+
+from mixins.journal import CrawlJournal
+from mixins.visited import VisitedIndex
+
+
+class Frontier:
+    """Crawl queue that hands out each URL at most once.
+
+    Every URL ever queued or marked as seen is in one VisitedIndex, so
+    membership is a hash lookup, and a URL is checked and queued under the
+    same lock, so two threads adding it at once cannot both succeed.
+    claim() blocks until a URL is queued, or returns None once the queue
+    is empty and no claimed URL is still being processed (nothing can be
+    added anymore), or after stop(). URLs are compared after canonicalize,
+    but queued as given: relative links resolve against the fetched URL.
+    The page a queued URL was found on is kept until take_source().
+    """
+
+    def __init__(self, index=None, canonicalize=None, journal=None):
+        self.seen = index if index is not None else VisitedIndex()
+        self.canonicalize = canonicalize or (lambda url: url)
+        self.journal = journal
+        self.queue = deque()
+        self.sources = {}
+        self.in_flight = 0
+        self.stopped = False
+        self.condition = Condition()
+
+    def __len__(self):
+        return len(self.queue)
+
+    def __contains__(self, url):
+        return self.canonicalize(url) in self.seen
+
+    def __log(self, op, url):
+        if self.journal:
+            self.journal.write(op, url)
+
+    def add(self, url, source=None):
+        """Queue a URL found on the page source, return False if it was queued or seen before."""
+        if not url:
+            return False
+        with self.condition:
+            if not self.seen.add(self.canonicalize(url)):
+                return False
+            self.queue.append(url)
+            if source:
+                self.sources[url] = source
+            self.__log(CrawlJournal.QUEUED, url)
+            self.condition.notify()
+        return True
+
+    def mark_seen(self, url):
+        """Remember a URL that is not fetched, return False if it was known already."""
+        url = self.canonicalize(url)
+        with self.condition:
+            if not self.seen.add(url):
+                return False
+            self.__log(CrawlJournal.SEEN, url)
+        return True
+
+    def claim(self, wait=True):
+        """Next URL to fetch, None when the crawl is over (or nothing is queued and not wait)."""
+        with self.condition:
+            while wait and not self.queue and self.in_flight and not self.stopped:
+                self.condition.wait()
+            if not self.queue or self.stopped:
+                return None
+            url = self.queue.popleft()
+            self.in_flight += 1
+            self.__log(CrawlJournal.CLAIMED, url)
+            return url
+
+    def take_source(self, url):
+        """The page a claimed URL was found on, '' for seeds and resumed URLs."""
+        with self.condition:
+            return self.sources.pop(url, '')
+
+    def done(self, url):
+        with self.condition:
+            self.in_flight -= 1
+            self.__log(CrawlJournal.DONE, url)
+            self.condition.notify_all()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+    def restore(self, pending, seen):
+        """Continue from the state of an interrupted crawl, see CrawlJournal.load."""
+        with self.condition:
+            # The index replaced may have spilled to disk.
+            if seen is not self.seen:
+                self.seen.close()
+            self.seen = seen
+            self.queue = deque(pending)
+            self.seen.update(self.canonicalize(url) for url in pending)
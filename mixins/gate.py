@@ -0,0 +1,79 @@
+import os
+from urllib.parse import urlparse
+
+
+class DownloadGate:
+    """Decides which crawled responses are downloaded, and how much of them.
+
+    URLs with a binary file extension are not requested at all. Other
+    responses are streamed: the body is dropped unread when Content-Type
+    starts with one of skip_types, a generic or missing type is dropped when
+    the first chunk contains NUL bytes, and at most max_size bytes are read
+    (0: no limit), which is still enough to find the links of a page.
+    """
+
+    CHUNK_SIZE = 1 << 16
+    MAX_SIZE = 5 << 20
+    SKIP_TYPES = (
+        'image/', 'video/', 'audio/', 'font/', 'application/pdf', 'application/zip',
+        'application/gzip', 'application/x-gzip', 'application/x-tar', 'application/x-bzip',
+        'application/x-7z-compressed', 'application/x-rar', 'application/vnd.rar',
+        'application/x-msdownload', 'application/x-dosexec', 'application/java-archive',
+        'application/vnd.android.package-archive', 'application/wasm', 'application/msword',
+        'application/vnd.ms-', 'application/vnd.openxmlformats', 'application/x-shockwave-flash',
+        'application/font-', 'application/x-font')
+    SKIP_EXTENSIONS = frozenset((
+        '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.avif', '.ico', '.tif', '.tiff', '.psd',
+        '.mp3', '.wav', '.ogg', '.flac', '.m4a', '.aac', '.mp4', '.m4v', '.mov', '.avi', '.mkv',
+        '.webm', '.wmv', '.flv', '.woff', '.woff2', '.ttf', '.otf', '.eot', '.pdf', '.zip', '.gz',
+        '.tgz', '.bz2', '.xz', '.tar', '.rar', '.7z', '.exe', '.msi', '.dmg', '.iso', '.bin', '.apk',
+        '.jar', '.deb', '.rpm', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.swf', '.wasm'))
+    # Types that say nothing about the content.
+    GENERIC_TYPES = ('', 'application/octet-stream', 'binary/octet-stream')
+
+    def __init__(self, skip_types=SKIP_TYPES, max_size=MAX_SIZE, skip_extensions=SKIP_EXTENSIONS):
+        self.skip_types = tuple(t.lower() for t in skip_types)
+        self.max_size = max_size
+        self.skip_extensions = frozenset(skip_extensions)
+
+    @classmethod
+    def from_options(cls, skip_types=None, max_size_kb=None):
+        """Gate for the --skip-types and --max-page-size values, 'none' lets everything through."""
+        if max_size_kb is not None and max_size_kb < 0:
+            raise ValueError(f'--max-page-size must not be negative: {max_size_kb}')
+        max_size = cls.MAX_SIZE if max_size_kb is None else max_size_kb << 10
+        if skip_types is None:
+            return cls(max_size=max_size)
+        types = [t.strip() for t in skip_types.split(',') if t.strip()]
+        if types == ['none']:
+            return cls((), max_size, ())
+        return cls(types, max_size)
+
+    def skip_url(self, url):
+        return os.path.splitext(urlparse(url).path)[1].lower() in self.skip_extensions
+
+    @staticmethod
+    def content_type(headers):
+        return (headers.get('Content-Type') or '').split(';', 1)[0].strip().lower()
+
+    def accepts(self, headers):
+        """False if the body is not worth downloading, from the headers alone."""
+        return not self.content_type(headers).startswith(self.skip_types) if self.skip_types else True
+
+    def is_binary(self, headers, head):
+        return (
+            bool(self.skip_types) and self.content_type(headers) in self.GENERIC_TYPES
+            and b'\0' in head)
+
+    def read(self, res):
+        """Body of a streamed requests response, up to max_size bytes; None if it is binary."""
+        chunks, size = [], 0
+        for chunk in res.iter_content(self.CHUNK_SIZE):
+            if not chunks and self.is_binary(res.headers, chunk):
+                return None
+            chunks.append(chunk)
+            size += len(chunk)
+            if self.max_size and size >= self.max_size:
+                break
+        body = b''.join(chunks)
+        return body[:self.max_size] if self.max_size else body
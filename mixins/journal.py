@@ -0,0 +1,89 @@
+import os
+from threading import Lock
+import time
+
+
+class CrawlJournal:
+    """Append-only record of the crawl frontier, for --resume.
+
+    One line per event: q (queued), c (claimed by a worker), d (done),
+    s (seen without fetching, e.g. scripts). Writes are buffered and
+    flushed every FLUSH_INTERVAL seconds, so a crash loses at most that
+    much progress, and nothing is ever rewritten while crawling. Loading
+    replays the events and compacts the file to the resulting state.
+    """
+
+    FLUSH_INTERVAL = 1.0
+    QUEUED, CLAIMED, DONE, SEEN = 'q', 'c', 'd', 's'
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = Lock()
+        self.file = None
+        self.last_flush = time.monotonic()
+
+    def __open(self, path, mode):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.file = open(path, mode, encoding='utf-8', errors='ignore')
+
+    def start(self, queued):
+        """Begin a new journal with the URLs already queued."""
+        self.__open(self.path, 'w')
+        for url in queued:
+            self.write(self.QUEUED, url)
+
+    def __events(self):
+        with open(self.path, encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                op, _, url = line.rstrip('\n').partition('\t')
+                if url:
+                    yield op, url
+
+    def load(self, visited, canonicalize=None):
+        """Replay the journal into visited, return the pending URLs and keep appending to it.
+
+        URLs that were claimed but not done are pending again, ahead of the
+        rest of the queue. Only pending URLs are held as strings. Queued URLs
+        are journaled as fetched, visited gets them after canonicalize.
+        """
+        canonicalize = canonicalize or (lambda url: url)
+        pending, claimed = {}, {}
+        for op, url in self.__events():
+            if op == self.QUEUED:
+                if url not in claimed:
+                    pending[url] = None
+            elif op == self.CLAIMED:
+                pending.pop(url, None)
+                claimed[url] = None
+            elif op == self.DONE:
+                pending.pop(url, None)
+                claimed.pop(url, None)
+                visited.add(canonicalize(url))
+            elif op == self.SEEN:
+                visited.add(canonicalize(url))
+        pending = list(claimed) + list(pending)
+        # Compacted copy of the state, then appended to as usual.
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8', errors='ignore') as f:
+            f.writelines(f'{self.QUEUED}\t{url}\n' for url in pending)
+            f.writelines(
+                f'{op}\t{url}\n' for op, url in self.__events() if op in (self.SEEN, self.DONE))
+        os.replace(tmp, self.path)
+        self.__open(self.path, 'a')
+        return pending
+
+    def write(self, op, url):
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.write(f'{op}\t{url}\n')
+            if time.monotonic() - self.last_flush >= self.FLUSH_INTERVAL:
+                self.file.flush()
+                self.last_flush = time.monotonic()
+
+    def close(self, finished=False):
+        """Flush the journal, remove it once the crawl has finished."""
+        with self.lock:
+            self.file.close()
+        if finished:
+            os.remove(self.path)
@@ -0,0 +1,107 @@
+from collections import OrderedDict
+from queue import Empty, Queue
+from threading import Thread
+import time
+
+from mixins.visited import VisitedIndex
+
+
+class OutputSink:
+    """Single writer for the crawl log files.
+
+    Crawler threads only enqueue (path, line) records. The writer thread
+    keeps up to MAX_OPEN_FILES handles open (least recently used ones are
+    closed), skips lines already written to a file and flushes every
+    FLUSH_INTERVAL seconds and on close. With resume, lines the files held
+    before are skipped as well. A record that cannot be written is
+    reported and dropped, the others are still written.
+
+    Written lines are remembered, as path and line, in the VisitedIndex
+    given (the crawler's own), so they share its memory limit.
+    """
+
+    FLUSH_INTERVAL = 1.0
+    BATCH_SIZE = 1000
+    # One log file per top-level directory of the target, so no fixed count.
+    MAX_OPEN_FILES = 64
+
+    def __init__(self, resume=False, index=None):
+        self.resume = resume
+        self.index = index if index is not None else VisitedIndex()
+        self.queue = Queue()
+        self.files = OrderedDict()
+        # Files whose lines are in the index, they are only read once.
+        self.loaded = set()
+        self.thread = Thread(target=self.__run, daemon=True)
+        self.thread.start()
+
+    def write(self, path, line):
+        self.queue.put((path, line))
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def __file(self, path):
+        f = self.files.get(path)
+        if f is not None:
+            self.files.move_to_end(path)
+            return f
+        if len(self.files) >= self.MAX_OPEN_FILES:
+            self.files.popitem(last=False)[1].close()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        f = open(path, 'a+', encoding='utf-8', errors='ignore')
+        if path not in self.loaded:
+            if self.resume:
+                f.seek(0)
+                self.index.update(self.__key(path, line.rstrip('\n')) for line in f)
+            self.loaded.add(path)
+        self.files[path] = f
+        return f
+
+    @staticmethod
+    def __key(path, line):
+        # NUL never occurs in a URL, so no key equals one of the crawler's.
+        return f'{path}\0{line}'
+
+    def __write_batch(self, batch):
+        for path, line in batch:
+            try:
+                f = self.__file(path)
+                if self.index.add(self.__key(path, line)):
+                    f.write(f'{line}\n')
+            except (OSError, ValueError) as e:
+                print(f'ERROR    :: Failed to write to {path}: {e}')
+
+    def __flush(self):
+        for path, f in self.files.items():
+            try:
+                f.flush()
+            except OSError as e:
+                print(f'ERROR    :: Failed to write to {path}: {e}')
+
+    def __run(self):
+        last_flush = time.monotonic()
+        running = True
+        while running:
+            batch = []
+            try:
+                item = self.queue.get(timeout=self.FLUSH_INTERVAL)
+                while item is not None:
+                    batch.append(item)
+                    if len(batch) >= self.BATCH_SIZE:
+                        break
+                    item = self.queue.get_nowait()
+                running = item is not None
+            except Empty:
+                pass
+            self.__write_batch(batch)
+            if not running or time.monotonic() - last_flush >= self.FLUSH_INTERVAL:
+                self.__flush()
+                last_flush = time.monotonic()
+        self.__flush()
+        for f in self.files.values():
+            try:
+                f.close()
+            except OSError:
+                pass
@@ -0,0 +1,146 @@
+import os
+from queue import Empty, Queue
+import sqlite3
+from threading import Thread
+import time
+
+
+class ResultStore:
+    """SQLite database of everything crawl and analysis runs report.
+
+    Each finding is a (target, kind, category, value, source) row with the
+    time it was last seen. Callers only enqueue rows, a writer thread
+    inserts them in batches, so a slow disk never blocks a crawl. A batch
+    that cannot be written is reported and dropped, later ones are still
+    written. The database is in WAL mode and can be queried while a scan
+    is writing. Values are full-text indexed when SQLite has FTS5.
+    """
+
+    DATABASE = 'scans/aranea.db'
+    FLUSH_INTERVAL = 1.0
+    BATCH_SIZE = 1000
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS findings (
+            id INTEGER PRIMARY KEY,
+            target TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            category TEXT NOT NULL DEFAULT '',
+            value TEXT NOT NULL,
+            source TEXT NOT NULL DEFAULT '',
+            seen REAL NOT NULL,
+            UNIQUE (target, kind, category, value, source)
+        );
+        CREATE INDEX IF NOT EXISTS findings_value ON findings (value);
+        CREATE INDEX IF NOT EXISTS findings_kind ON findings (kind, category);
+    '''
+    FTS_SCHEMA = '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS findings_fts USING fts5 (
+            value, content='findings', content_rowid='id', tokenize='trigram');
+        CREATE TRIGGER IF NOT EXISTS findings_ai AFTER INSERT ON findings BEGIN
+            INSERT INTO findings_fts (rowid, value) VALUES (new.id, new.value);
+        END;
+    '''
+    INSERT = '''
+        INSERT INTO findings (target, kind, category, value, source, seen)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (target, kind, category, value, source) DO UPDATE SET seen = excluded.seen
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Created here so that schema errors surface in the caller.
+        self.connection = self.connect(path)
+        self.queue = Queue()
+        self.thread = Thread(target=self.__run, daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def connect(cls, path):
+        # Targets crawled in parallel each write through their own connection.
+        connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.executescript(cls.SCHEMA)
+        try:
+            connection.executescript(cls.FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            # No FTS5 (or no trigram tokenizer), queries fall back to LIKE.
+            pass
+        return connection
+
+    def add(self, target, kind, value, source='', category=''):
+        self.queue.put((target, kind, category or '', value, source or '', time.time()))
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def __insert(self, rows):
+        with self.connection:
+            self.connection.executemany(self.INSERT, rows)
+
+    def __write_batch(self, batch):
+        if not batch:
+            return
+        try:
+            self.__insert(batch)
+        except sqlite3.OperationalError as e:
+            # Locked, full or unwritable database.
+            print(f'ERROR    :: Failed to store {len(batch)} results in {self.path}: {e}')
+        except (sqlite3.Error, ValueError):
+            # A row that cannot be stored fails its batch, the others are kept.
+            failed = 0
+            for row in batch:
+                try:
+                    self.__insert([row])
+                except (sqlite3.Error, ValueError) as e:
+                    failed += 1
+                    error = e
+            if failed:
+                print(f'ERROR    :: Failed to store {failed} results in {self.path}: {error}')
+
+    def __run(self):
+        running = True
+        while running:
+            batch = []
+            try:
+                item = self.queue.get(timeout=self.FLUSH_INTERVAL)
+                while item is not None:
+                    batch.append(item)
+                    if len(batch) >= self.BATCH_SIZE:
+                        break
+                    item = self.queue.get_nowait()
+                running = item is not None
+            except Empty:
+                pass
+            self.__write_batch(batch)
+        self.connection.close()
+
+    @classmethod
+    def query(cls, path, text, kind=None, limit=100):
+        """Rows whose value contains text, most recently seen first."""
+        connection = cls.connect(path)
+        has_fts = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'findings_fts'").fetchone()
+        columns = 'f.target, f.kind, f.category, f.value, f.source, f.seen'
+        # The trigram tokenizer needs at least three characters.
+        if has_fts and len(text) >= 3:
+            sql = (
+                f'SELECT {columns} FROM findings_fts JOIN findings f ON f.id = findings_fts.rowid '
+                'WHERE findings_fts MATCH ?')
+            args = ['"' + text.replace('"', '""') + '"']
+        else:
+            sql = f"SELECT {columns} FROM findings f WHERE f.value LIKE ? ESCAPE '\\'"
+            args = ['%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%']
+        if kind:
+            sql += ' AND f.kind = ?'
+            args.append(kind)
+        sql += ' ORDER BY f.seen DESC LIMIT ?'
+        args.append(limit)
+        try:
+            return connection.execute(sql, args).fetchall()
+        finally:
+            connection.close()
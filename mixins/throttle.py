@@ -0,0 +1,131 @@
+import asyncio
+import time
+from threading import Condition
+
+
+class HostLimiter:
+    """Adaptive (AIMD) concurrency window per host.
+
+    A host starts with a small window that doubles every round trip until
+    the first backoff (slow start), then grows by about one request per
+    window of responses while latency stays stable. It halves on 429/503
+    responses or timeouts, pausing the host for Retry-After (or an
+    exponential cooldown) before the next request goes out. With max_total,
+    no more requests than that are in flight over all hosts together.
+    """
+
+    BACKOFF_STATUSES = (429, 503)
+    INITIAL_LIMIT = 2
+    SLOW_FACTOR = 2.0
+    COOLDOWN = 1.0
+    MAX_COOLDOWN = 30.0
+
+    def __init__(self, max_limit, max_total=None):
+        self.max_limit = max(1, max_limit)
+        self.max_total = max_total
+        self.in_flight = 0
+        self.hosts = {}
+        self.cv = Condition()
+        # (loop, asyncio.Event) of coroutines waiting in acquire_async().
+        self.waiters = []
+
+    def __host(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = {
+                'limit': float(min(self.INITIAL_LIMIT, self.max_limit)),
+                'in_flight': 0,
+                'slow_start': True,
+                'resume_at': 0.0,
+                'cooldown': self.COOLDOWN,
+                'ewma': None,
+                'requests': 0,
+                'errors': 0,
+                'throttled': 0,
+                'latency': 0.0
+            }
+        return state
+
+    def acquire(self, host, block=True):
+        with self.cv:
+            state = self.__host(host)
+            while True:
+                wait = state['resume_at'] - time.monotonic()
+                if (wait <= 0 and state['in_flight'] < int(state['limit'])
+                        and (not self.max_total or self.in_flight < self.max_total)):
+                    state['in_flight'] += 1
+                    self.in_flight += 1
+                    return True
+                if not block:
+                    return False
+                self.cv.wait(wait if wait > 0 else None)
+
+    async def acquire_async(self, host):
+        """acquire() for coroutines, waits for a release() without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            waiter = (loop, asyncio.Event())
+            with self.cv:
+                if self.acquire(host, block=False):
+                    return True
+                wait = self.hosts[host]['resume_at'] - time.monotonic()
+                self.waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter[1].wait(), wait if wait > 0 else None)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self.cv:
+                    if waiter in self.waiters:
+                        self.waiters.remove(waiter)
+
+    def release(self, host, latency, status=None, timed_out=False, retry_after=None):
+        with self.cv:
+            state = self.hosts[host]
+            state['in_flight'] -= 1
+            self.in_flight -= 1
+            state['requests'] += 1
+            state['latency'] += latency
+            if timed_out or status in self.BACKOFF_STATUSES:
+                state['throttled'] += 1
+                state['slow_start'] = False
+                state['limit'] = max(1.0, state['limit'] / 2)
+                pause = retry_after if retry_after is not None else state['cooldown']
+                state['resume_at'] = max(state['resume_at'], time.monotonic() + pause)
+                state['cooldown'] = min(self.MAX_COOLDOWN, state['cooldown'] * 2)
+            elif status is None:
+                state['errors'] += 1
+            else:
+                state['cooldown'] = self.COOLDOWN
+                ewma = state['ewma']
+                if ewma is None or latency <= ewma * self.SLOW_FACTOR:
+                    step = 1 if state['slow_start'] else 1 / state['limit']
+                    state['limit'] = min(float(self.max_limit), state['limit'] + step)
+                state['ewma'] = latency if ewma is None else 0.8 * ewma + 0.2 * latency
+            self.cv.notify_all()
+            for loop, event in self.waiters:
+                try:
+                    loop.call_soon_threadsafe(event.set)
+                except RuntimeError:
+                    # The loop was closed while its coroutine waited.
+                    pass
+            self.waiters.clear()
+
+    def stats(self):
+        with self.cv:
+            return [
+                {
+                    'host': host,
+                    'requests': state['requests'],
+                    'errors': state['errors'],
+                    'throttled': state['throttled'],
+                    'avg_ms': int(1000 * state['latency'] / state['requests']) if state['requests'] else 0,
+                    'limit': int(state['limit'])
+                } for host, state in sorted(self.hosts.items())]
+
+    @staticmethod
+    def parse_retry_after(value):
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            return None
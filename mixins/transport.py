@@ -0,0 +1,228 @@
+import asyncio
+from http.cookiejar import DefaultCookiePolicy
+from threading import Lock
+import time
+from urllib.parse import urlparse
+from urllib3.exceptions import InsecureRequestWarning, ReadTimeoutError
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError, SSLError, Timeout
+
+from mixins.charset import decode
+from mixins.throttle import HostLimiter
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
+
+
+class Transport:
+    """Keep-alive HTTP session shared by every fetch of a run.
+
+    Connection pools are sized to the thread count and hosts that fail
+    certificate verification once are fetched with verify=False from then on.
+    Every request passes through the per-host HostLimiter, which also holds
+    the in-flight budget of targets run in parallel; a streamed response
+    keeps its slot until the body is read or closed. With a ResponseCache
+    set, GET responses are served from and stored to disk.
+    """
+
+    TIMEOUT = 30
+    RETRIES = 2
+
+    _SHARED = None
+    _SHARED_LOCK = Lock()
+
+    def __init__(self, pool_size=10, hosts=None, budget=None):
+        self.pool_size = pool_size
+        self.hosts = max(hosts or 0, pool_size)
+        self.insecure_hosts = set()
+        self.limiter = HostLimiter(pool_size, budget)
+        self.cache = None
+        self.session = requests.Session()
+        # Like separate requests.get calls, no cookie is carried over.
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(
+            pool_connections=self.hosts, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @classmethod
+    def shared(cls, pool_size=None, hosts=None, budget=None):
+        """The transport of the run, replaced by a larger one if pool_size or hosts grow."""
+        with cls._SHARED_LOCK:
+            current = cls._SHARED
+            if current is None:
+                cls._SHARED = cls(pool_size or 10, hosts, budget)
+            elif (pool_size or 0) > current.pool_size or (hosts or 0) > current.hosts:
+                cls._SHARED = cls(
+                    max(pool_size or 0, current.pool_size), max(hosts or 0, current.hosts),
+                    budget or current.limiter.max_total)
+                cls._SHARED.cache = current.cache
+            return cls._SHARED
+
+    def ensure_cache(self, new_cache):
+        """Set the response cache to new_cache() unless one is set already."""
+        with self._SHARED_LOCK:
+            if self.cache is None:
+                self.cache = new_cache()
+            return self.cache
+
+    def __get(self, url, host, **kwargs):
+        if host in self.insecure_hosts:
+            return self.session.get(url, verify=False, **kwargs)
+        try:
+            return self.session.get(url, **kwargs)
+        except SSLError:
+            # set.add is atomic, a race only costs one extra handshake.
+            self.insecure_hosts.add(host)
+            return self.session.get(url, verify=False, **kwargs)
+
+    @staticmethod
+    def __is_timeout(e):
+        # A timeout while reading the body surfaces as a ConnectionError.
+        return isinstance(e, Timeout) or (
+            isinstance(e, RequestsConnectionError) and bool(e.args)
+            and isinstance(e.args[0], ReadTimeoutError))
+
+    def __limited_get(self, url, host, **kwargs):
+        self.limiter.acquire(host)
+        start = time.monotonic()
+        try:
+            res = self.__get(url, host, **kwargs)
+        except BaseException as e:
+            self.limiter.release(
+                host, time.monotonic() - start, timed_out=self.__is_timeout(e))
+            raise
+        retry_after = HostLimiter.parse_retry_after(res.headers.get('Retry-After'))
+        if res._content_consumed:
+            self.limiter.release(
+                host, time.monotonic() - start, res.status_code, False, retry_after)
+        else:
+            self.__hold_slot(res, host, start, retry_after)
+        return res
+
+    def __hold_slot(self, res, host, start, retry_after):
+        """Keep the host slot of a streamed response until its body is read or it is closed,
+        so a slow or stalled body still counts toward the backoff.
+        """
+        held = {'released': False, 'status': res.status_code, 'timed_out': False}
+        close, iter_content = res.close, res.iter_content
+
+        def release():
+            if not held['released']:
+                held['released'] = True
+                self.limiter.release(
+                    host, time.monotonic() - start, held['status'], held['timed_out'], retry_after)
+
+        def read(*args, **kwargs):
+            try:
+                yield from iter_content(*args, **kwargs)
+            except Exception as e:
+                held['timed_out'] = self.__is_timeout(e)
+                held['status'] = res.status_code if held['timed_out'] else None
+                release()
+                raise
+            release()
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                release()
+
+        res.iter_content = read
+        res.close = close_and_release
+
+    def __retrying_get(self, url, **kwargs):
+        host = urlparse(url).netloc
+        for attempt in range(self.RETRIES + 1):
+            res = self.__limited_get(url, host, **kwargs)
+            if res.status_code not in HostLimiter.BACKOFF_STATUSES or attempt == self.RETRIES:
+                break
+            # Hand the connection of a streamed response back to the pool.
+            res.close()
+        return res
+
+    def get(self, url, accept=None, limit=None, binary=None, **kwargs):
+        """GET through the cache. A 200 response is only cached if accept(headers)
+        allows it and binary(headers, first_chunk) is false, and a streamed
+        body larger than limit bytes is cut there and not cached.
+        """
+        kwargs.setdefault('timeout', self.TIMEOUT)
+        if self.cache is None:
+            return self.__retrying_get(url, **kwargs)
+        stream = kwargs.get('stream', False)
+        headers = kwargs.get('headers') or {}
+        key = self.cache.key(url, headers)
+        entry = self.cache.lookup(key)
+        if entry and self.cache.is_fresh(entry):
+            cached = self.cache.response(entry, url, stream)
+            if cached is not None:
+                return cached
+            entry = None
+        if entry:
+            kwargs['headers'] = {**headers, **self.cache.validators(entry)}
+        res = self.__retrying_get(url, **kwargs)
+        if entry and res.status_code == 304:
+            res.close()
+            cached = self.cache.response(entry, url, stream, revalidated=True)
+            if cached is not None:
+                return cached
+            # Evicted meanwhile, fetched again in full.
+            kwargs['headers'] = headers
+            res = self.__retrying_get(url, **kwargs)
+        if res.status_code == 200 and (accept is None or accept(res.headers)):
+            return self.cache.store(key, url, res, stream, limit, binary)
+        return res
+
+    async def __get_async(self, session, url, host, accept=None, limit=None):
+        ssl = False if host in self.insecure_hosts else None
+        try:
+            async with session.get(url, ssl=ssl) as res:
+                if accept is not None and not accept(res.headers):
+                    return res.status, res.headers, ''
+                if not limit:
+                    return res.status, res.headers, decode(await res.read(), res.headers)
+                body = bytearray()
+                while len(body) < limit:
+                    chunk = await res.content.read(limit - len(body))
+                    if not chunk:
+                        break
+                    body += chunk
+                return res.status, res.headers, decode(bytes(body), res.headers)
+        except aiohttp.ClientSSLError:
+            if ssl is False:
+                raise
+            self.insecure_hosts.add(host)
+            return await self.__get_async(session, url, host, accept, limit)
+
+    async def __limited_get_async(self, session, url, host, accept=None, limit=None):
+        await self.limiter.acquire_async(host)
+        start = time.monotonic()
+        status = retry_after = None
+        timed_out = False
+        try:
+            status, headers, text = await self.__get_async(session, url, host, accept, limit)
+            retry_after = HostLimiter.parse_retry_after(headers.get('Retry-After'))
+            return status, headers, text
+        except asyncio.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.limiter.release(
+                host, time.monotonic() - start, status, timed_out, retry_after)
+
+    async def get_async(self, session, url, accept=None, limit=None):
+        """aiohttp counterpart of get(), returns (headers, text). Uncached."""
+        host = urlparse(url).netloc
+        for _ in range(self.RETRIES + 1):
+            status, headers, text = await self.__limited_get_async(session, url, host, accept, limit)
+            if status not in HostLimiter.BACKOFF_STATUSES:
+                break
+        return headers, text
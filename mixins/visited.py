@@ -0,0 +1,228 @@
+from array import array
+from bisect import bisect_left, bisect_right
+import hashlib
+import math
+import mmap
+import os
+import tempfile
+from threading import Lock
+
+
+def fingerprint(url):
+    """64-bit hash of a URL, collisions are negligible below billions of URLs."""
+    return int.from_bytes(
+        hashlib.blake2b(url.encode('utf-8', errors='surrogatepass'), digest_size=8).digest(), 'little')
+
+
+class BloomFilter:
+    """Fixed capacity Bloom filter over 64-bit fingerprints."""
+
+    def __init__(self, capacity, fp_rate):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, int(-self.capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def __positions(self, fp):
+        # Double hashing on the two halves of the fingerprint.
+        h1, h2, size = fp & 0xffffffff, (fp >> 32) | 1, self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, fp):
+        bits = self.bits
+        for p in self.__positions(fp):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def __contains__(self, fp):
+        bits = self.bits
+        for p in self.__positions(fp):
+            if not bits[p >> 3] & (1 << (p & 7)):
+                return False
+        return True
+
+
+class ScalableBloomFilter:
+    """Bloom filter that grows as needed and keeps its overall false positive rate.
+
+    Each new filter is GROWTH times larger and has a TIGHTENING times lower
+    error rate than the previous one, so the rates sum to at most fp_rate.
+    """
+
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    def __init__(self, fp_rate, capacity=1 << 16):
+        self.fp_rate = fp_rate
+        self.filters = [BloomFilter(capacity, fp_rate * (1 - self.TIGHTENING))]
+
+    def add(self, fp):
+        last = self.filters[-1]
+        if last.count >= last.capacity:
+            rate = self.fp_rate * (1 - self.TIGHTENING) * self.TIGHTENING ** len(self.filters)
+            last = BloomFilter(last.capacity * self.GROWTH, rate)
+            self.filters.append(last)
+        last.add(fp)
+
+    def __contains__(self, fp):
+        return any(fp in f for f in self.filters)
+
+
+class VisitedIndex:
+    """Set of URLs that stores 8-byte fingerprints instead of the strings.
+
+    New fingerprints go into a small set, which is sorted into compact
+    arrays when full; arrays of similar size are merged, so lookups
+    bisect a handful of them. Once the arrays take more than max_memory
+    bytes the largest is moved to a memory-mapped temporary file. Files
+    of similar size are merged on disk the same way, and one Bloom filter
+    over everything spilled keeps most misses off the disk.
+
+    With fp_rate only a scalable Bloom filter is kept (about 1.2 bytes per
+    URL at 1%): far less memory, but that share of new URLs is wrongly
+    reported as visited.
+    """
+
+    RECENT = 1 << 16
+    MAX_MEMORY = 512 << 20
+    SPILL_FP_RATE = 0.01
+    # Fingerprints read from each spilled run per step of a merge.
+    MERGE_BLOCK = 1 << 20
+
+    def __init__(self, fp_rate=None, max_memory=None):
+        self.lock = Lock()
+        self.count = 0
+        self.bloom = ScalableBloomFilter(fp_rate) if fp_rate else None
+        self.max_memory = max_memory or self.MAX_MEMORY
+        self.recent = set()
+        self.runs = []
+        # (path, mmap, memoryview of the fingerprints), largest first.
+        self.spilled = []
+        self.spilled_bloom = ScalableBloomFilter(self.SPILL_FP_RATE)
+        self.spill_dir = None
+        self.spill_count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, url):
+        fp = fingerprint(url)
+        with self.lock:
+            return self.__has(fp)
+
+    def __has(self, fp):
+        if self.bloom:
+            return fp in self.bloom
+        if fp in self.recent:
+            return True
+        for run in self.runs:
+            i = bisect_left(run, fp)
+            if i < len(run) and run[i] == fp:
+                return True
+        if self.spilled and fp in self.spilled_bloom:
+            for _, _, run in self.spilled:
+                i = bisect_left(run, fp)
+                if i < len(run) and run[i] == fp:
+                    return True
+        return False
+
+    def add(self, url):
+        """Add a URL, return False if it was already in the index."""
+        fp = fingerprint(url)
+        with self.lock:
+            if self.__has(fp):
+                return False
+            self.count += 1
+            if self.bloom:
+                self.bloom.add(fp)
+                return True
+            self.recent.add(fp)
+            if len(self.recent) >= self.RECENT:
+                self.__compact()
+            return True
+
+    def update(self, urls):
+        for url in urls:
+            self.add(url)
+
+    def __compact(self):
+        run = array('Q', sorted(self.recent))
+        self.recent = set()
+        # Like a binary counter: a run is merged while the one before is not larger.
+        while self.runs and len(self.runs[-1]) <= len(run):
+            merged = self.runs.pop()
+            merged.extend(run)
+            run = array('Q', sorted(merged))
+        self.runs.append(run)
+        if sum(len(r) for r in self.runs) * run.itemsize > self.max_memory:
+            self.__spill(max(self.runs, key=len))
+
+    def __new_spill_path(self):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix='aranea-visited-')
+        self.spill_count += 1
+        return os.path.join(self.spill_dir, f'{self.spill_count}.run')
+
+    def __spill(self, run):
+        self.runs.remove(run)
+        for fp in run:
+            self.spilled_bloom.add(fp)
+        path = self.__new_spill_path()
+        with open(path, 'wb') as f:
+            run.tofile(f)
+        del run
+        # The same binary counter as in memory, so there are only
+        # logarithmically many files to look in.
+        while self.spilled and len(self.spilled[-1][2]) <= os.path.getsize(path) // 8:
+            path = self.__merge(self.spilled.pop(), path)
+        self.spilled.append(self.__open_run(path))
+
+    @staticmethod
+    def __open_run(path):
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return path, mm, memoryview(mm).cast('Q')
+
+    @staticmethod
+    def __release(spilled):
+        path, mm, run = spilled
+        run.release()
+        mm.close()
+        os.remove(path)
+
+    def __merge(self, spilled, path):
+        """Merge a spilled run with the run file at path into a new file, return its path."""
+        other = self.__open_run(path)
+        a, b = spilled[2], other[2]
+        merged = self.__new_spill_path()
+        i = j = 0
+        with open(merged, 'wb') as f:
+            while i < len(a) and j < len(b):
+                end_a, end_b = min(i + self.MERGE_BLOCK, len(a)), min(j + self.MERGE_BLOCK, len(b))
+                # Everything up to the smaller of the two block ends is final.
+                if a[end_a - 1] <= b[end_b - 1]:
+                    end_b = bisect_right(b, a[end_a - 1], j, end_b)
+                else:
+                    end_a = bisect_right(a, b[end_b - 1], i, end_a)
+                block = array('Q', a[i:end_a])
+                block.extend(b[j:end_b])
+                array('Q', sorted(block)).tofile(f)
+                i, j = end_a, end_b
+            f.write(a[i:])
+            f.write(b[j:])
+        self.__release(spilled)
+        self.__release(other)
+        return merged
+
+    def close(self):
+        """Remove the spilled runs."""
+        with self.lock:
+            for spilled in self.spilled:
+                self.__release(spilled)
+            self.spilled = []
+            if self.spill_dir:
+                for name in os.listdir(self.spill_dir):
+                    os.remove(os.path.join(self.spill_dir, name))
+                os.rmdir(self.spill_dir)
+                self.spill_dir = None
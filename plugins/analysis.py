@@ -1,27 +1,37 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import hashlib
+import io
+import multiprocessing
 import os
 import re
-import warnings
-
-try:
-    from bs4 import BeautifulSoup as bs, MarkupResemblesLocatorWarning
-except ImportError:
-    from bs4 import BeautifulSoup as bs
-    # Fallback if MarkupResemblesLocatorWarning is not available in older versions
-    MarkupResemblesLocatorWarning = None
-
+import tempfile
+from threading import Lock
+
+from mixins.charset import decode_stream
+from mixins.store import ResultStore
+from plugins.chunks import ChunkFinder, find_chunks, import_map_urls, resolve_chunk
+from plugins.findings import FindingsStore
+from plugins.links import extract_links
+from plugins.paths import IgnoreList, PathClassifier, data_file, read_lines
+from plugins.scanner import Scanner, usable_cpus
 from utils.strings import MAINJS_NOT_FOUND
 
-if MarkupResemblesLocatorWarning:
-    warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
-
 
 class Analysis:
 
     BAD_CHARS = (' ', '\n', '\r', '$', '<', '>', '{', '}', '[', ']', '(', ')', '*', '~', '^', '@', ',', '\\')
 
-    SECTIONS = open('utils/sections.txt').read().splitlines()
-    IGNORE_LIST = open('utils/ignorelist.txt', errors='ignore').read().splitlines()
-
+    # Data files are read when an analysis starts, not at import time.
+    SECTIONS_FILE = data_file('sections.txt')
+    IGNORE_LIST_FILE = data_file('ignorelist.txt')
+    PATH_RULES_FILE = data_file('path_rules.txt')
+    # Targets analyzed in parallel append to the output file one at a time.
+    OUTPUT_LOCK = Lock()
+    # Worker processes shared by all targets of a run, see scanner_pool.
+    SCANNERS = None
+    SCANNERS_LOCK = Lock()
+
+    # Reference patterns for the object/list literals, matched by LiteralExtractor.
     REG_O = r'(?:(?:\"[a-zA-Z0-9_\-]*\"|\'[a-zA-Z0-9_\-]*\'|[a-zA-Z0-9_\-]+)\s*[:=]\s*\{(?:(?:\"[a-zA-Z0-9_\-]*\"|\'[a-zA-Z0-9_\-]*\'|[a-zA-Z0-9_\-]+)\s*:\s*(?:(?:\"[a-zA-Z0-9_\-/\\]*\"|\'[a-zA-Z0-9_\-/\\]*\'|[a-zA-Z0-9_\-/\\]+))\s*(?:,)?\s*)+\})'
     REG_L = r'(?:(?:\"[a-zA-Z0-9_\-]*\"|\'[a-zA-Z0-9_\-]*\'|[a-zA-Z0-9_\-]+)\s*[:=]\s*\[(?:(?:\"[a-zA-Z0-9_\-]*\"|\'[a-zA-Z0-9_\-]*\'|[a-zA-Z0-9_\-]+)\s*(?:,)?\s*)+\])'
     
@@ -34,28 +44,68 @@ class Analysis:
     REG_IP = r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b'
     REG_EMAIL = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
     REG_DOM_SINK = r'innerHTML|outerHTML|document\.write|dangerouslySetInnerHTML|bypassSecurityTrustHtml'
-    REG_DOM_SINK = r'innerHTML|outerHTML|document\.write|dangerouslySetInnerHTML|bypassSecurityTrustHtml'
-    REG_TODO = r'//\s*(TODO|FIXME|HACK|XXX).*'
+    REG_TODO = r'//\s*(?:TODO|FIXME|HACK|XXX).*'
     
     
     def __strip_ansi(self, text):
         return re.sub(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])', '', text)
     
-    def _log(self, message):
+    def _log(self, message, plain=None):
         print(message)
-        if hasattr(self, 'output_file') and self.output_file:
-             # Strip ANSI codes
-             plain_message = self.__strip_ansi(message)
-             with open(self.output_file, 'a+', encoding='utf-8', errors='ignore') as f:
-                 f.write(plain_message + '\n')
+        if getattr(self, 'output', None):
+            # Strip ANSI codes unless the caller already has the plain text
+            if plain is None:
+                plain = self.__strip_ansi(message)
+            self.output.write(plain + '\n')
+
+    def __emit(self, value, colour, key, js_file='', group=None, plain=None):
+        """Render one finding in colour on the console and as plain text in the output file and HTML report."""
+        plain = value if plain is None else plain
+        # Only marked when there is a previous run to compare with.
+        previous = getattr(self, 'previous', None)
+        new = previous is not None and (key, plain) not in previous
+        if hasattr(self, 'reported'):
+            self.reported.add((key, plain))
+        if getattr(self, 'store', None):
+            self.store.add(self.base, key, plain, js_file, group)
+        if new:
+            self._log(f'{colour}{value}{self.WHITE} {self.GREEN}[NEW]{self.WHITE}', f'{plain} [NEW]')
+        else:
+            self._log(f'{colour}{value}{self.WHITE}', plain)
+        if hasattr(self, 'html_data'):
+            bucket = self.html_data.setdefault(key, {} if group else [])
+            if group:
+                bucket = bucket.setdefault(group, [])
+            bucket.append({'value': plain, 'file': js_file, 'new': new})
+
+    @classmethod
+    def scanner_pool(cls):
+        """The process pool that scans large JS sources, one per run however many
+        targets are analyzed. None with a single CPU, where it only adds overhead.
+        """
+        if usable_cpus() < 2:
+            return None
+        with cls.SCANNERS_LOCK:
+            if cls.SCANNERS is None:
+                # Worker processes only start once something is submitted.
+                cls.SCANNERS = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+            return cls.SCANNERS
 
     def __get_js_urls(self, url):
-        http = self._get_page_source(url).text
-        soup = bs(http, 'html.parser')
-        for script in soup.find_all('script'):
-            path = script.get('src')
+        http = self._get_page_text(url)
+        links = extract_links(http, self.html_parser)
+        for path, text in links.scripts:
             if path:
                 yield self._process_path(url, path)
+            elif text:
+                # Inlined webpack runtimes and Vite entries.
+                for chunk in find_chunks(text):
+                    yield resolve_chunk(url, chunk)
+        for path in links.preloads:
+            yield self._process_path(url, path)
+        for text in links.import_maps:
+            for path in import_map_urls(text):
+                yield self._process_path(url, path)
 
     def __find_mainjs(self, url):
         if '.js' in url or self.strict:
@@ -64,99 +114,9 @@ class Analysis:
             if 'main' in js_file:
                 return js_file
 
-    def __add_to_dict(self, k, v, dic):
-        if k not in dic:
-            dic[k] = [v]
-        else:
-            if v not in dic[k]:
-                dic[k].append(v)
-        return dic
-    
-    def __add_path(self, path, paths):
-        # Modify the order based on your needs.
-
-        # Standard keywords.
-        if 'assets' in path.lower():
-            self.__add_to_dict('Assets', path, paths)  
-        elif 'cloudfront' in path.lower():
-            self.__add_to_dict('Cloudfront', path, paths)
-        elif 'amazonaws' in path.lower():
-            self.__add_to_dict('AWS', path, paths)
-        elif 'github' in path.lower():
-            self.__add_to_dict('Github', path, paths)
-        elif 'gitlab.com' in path.lower():
-            self.__add_to_dict('GitLab', path, paths)
-        elif 'bitbucket.org' in path.lower():
-            self.__add_to_dict('Bitbucket', path, paths)
-        elif 'atlassian.net' in path.lower():
-            self.__add_to_dict('Jira/Atlassian', path, paths)
-        elif any(kw in path.lower() for kw in ('docs.google.com', 'drive.google.com', 'sheets.google.com')):
-            self.__add_to_dict('Google Docs/Drive', path, paths)
-        elif 'slack.com' in path.lower():
-            self.__add_to_dict('Slack', path, paths)
-        elif 'discord' in path.lower():
-            self.__add_to_dict('Discord', path, paths)
-        elif 'blob.core.windows' in path.lower():
-            self.__add_to_dict('Azure Containers', path, paths)
-        elif 'storage.googleapis.com' in path.lower():
-            self.__add_to_dict('Google Cloud Storage', path, paths)
-        elif 'digitaloceanspaces.com' in path.lower():
-            self.__add_to_dict('DigitalOcean Spaces', path, paths)
-        elif 'herokuapp.com' in path.lower():
-            self.__add_to_dict('Heroku App', path, paths)
-        elif 'firebase' in path.lower():
-            self.__add_to_dict('Firebase', path, paths)
-        elif 'sentry.io' in path.lower():
-            self.__add_to_dict('Sentry', path, paths)
-        elif 'cloudinary.com' in path.lower():
-            self.__add_to_dict('Cloudinary', path, paths)
-        elif 'auth0.com' in path.lower() or 'okta.com' in path.lower():
-            self.__add_to_dict('Auth Provider', path, paths)
-        elif 'twilio.com' in path.lower():
-             self.__add_to_dict('Twilio', path, paths)
-        elif 'mailgun' in path.lower() or 'sendgrid' in path.lower():
-             self.__add_to_dict('Email Provider', path, paths)
-        elif 'paypal.com' in path.lower():
-             self.__add_to_dict('PayPal', path, paths)
-        elif 'stripe.com' in path.lower():
-             self.__add_to_dict('Stripe', path, paths)
-        elif 'squareup.com' in path.lower():
-             self.__add_to_dict('Square', path, paths)
-        elif 'youtube.com' in path.lower():
-             self.__add_to_dict('YouTube', path, paths)
-        
-        elif '.json' in path.lower():
-            self.__add_to_dict('JSON Files', path, paths)
-        elif '.js' in path.lower():
-            self.__add_to_dict('JS Files', path, paths)
-        elif '.ts' in path.lower():
-            self.__add_to_dict('TS Files', path, paths)
-        elif any(kw in path.lower() for kw in ('.png', '.jpg', '.gif', '.svg', '.webp')):
-            self.__add_to_dict('Images', path, paths)
-        elif 'module' in path.lower():
-            self.__add_to_dict('Modules', path, paths)
-        
-        # Additional keywords.
-        elif any(kw in path.lower() for kw in ('graphql', 'graph')):
-             self.__add_to_dict('GraphQL', path, paths)
-        elif any(kw in path.lower() for kw in ('swagger', 'openapi', 'api-docs')):
-             self.__add_to_dict('API Docs', path, paths)
-        elif 'api' in path.lower():
-            self.__add_to_dict('API Paths', path, paths)
-        elif any(kw in path.lower() for kw in ('login', 'register')):
-            self.__add_to_dict('Auth Paths', path, paths)
-        elif 'user' in path.lower():
-            self.__add_to_dict('User Paths', path, paths)
-        elif 'admin' in path.lower():
-            self.__add_to_dict('Admin Paths', path, paths)
-        elif 'role' in path.lower():
-            self.__add_to_dict('Role Paths', path, paths)
-        else:
-            self.__add_to_dict('Not Classified', path, paths)
-
     def __extract_paths(self, data):
         paths = {}
-        checked = []
+        checked = set()
         for e in data:
             e = e.strip()
             if e.lower() in checked:
@@ -164,68 +124,73 @@ class Analysis:
                 # Add printing
                 pass
             else:
-                checked.append(e.lower())
-                self.__add_path(e, paths)
+                checked.add(e.lower())
+                paths.setdefault(self.path_rules.classify(e), []).append(e)
         return paths
     
     def __has_no_bad_char(self, s: str):
         return not any(char in self.BAD_CHARS for char in s.strip())
 
-    # Regex to extract contents of JS string literals:
-    # group 1 = double-quoted, group 2 = single-quoted, group 3 = template literal (backtick)
-    _RE_JS_STRINGS = re.compile(
-        r'"((?:[^"\\]|\\.)*)"|\'((?:[^\'\\]|\\.)*)'
-        r'|`((?:[^`\\]|\\.)*)`',
-        re.DOTALL
-    )
+    # JS sources are read and scanned in chunks of this many characters.
+    CHUNK_SIZE = 1 << 16
+    # Sources larger than this are hashed through a temporary file.
+    SPOOL_SIZE = 8 << 20
+
     # Template literal interpolation pattern  ${...}
     _RE_INTERP = re.compile(r'\$\{[^}]*\}')
 
-    def __extract_js_strings(self, js):
-        """Yield all string literal contents from JS (double, single, backtick quotes)."""
-        for m in self._RE_JS_STRINGS.finditer(js):
-            raw = m.group(1) or m.group(2) or m.group(3) or ''
-            # Strip template-literal interpolations so ${lang} etc. don't trigger BAD_CHARS
-            yield self._RE_INTERP.sub('', raw).strip()
-
-    def __get_paths(self, js):
-        data = [
-            entry for entry in set(self.__extract_js_strings(js))
-            if (
-                '/' in entry                           # Possible Path
-                and len(entry) > 2                     # Min Length
-                and len(entry) < 100                   # Max Length
-                and self.__has_no_bad_char(entry)      # Filter
-                and entry not in self.IGNORE_LIST      # Black List
-                and not entry.endswith('.css')         # Exclude CSS files
-                and not entry.endswith('.otf')
-                and not entry.endswith('.woff')
-                and not entry.endswith('.woff2')
-                and not entry.endswith('.ico')
-            )
-        ]
+    # All detectors, compiled once and run together by __parse_js.
+    SCANNER = Scanner(
+        secrets=(
+            ('AWS Key', 'AKIA', REG_AWS),
+            ('Google Key', 'AIza', REG_GOOGLE),
+            ('Stripe Key', 'sk_live_', REG_STRIPE),
+            ('JWT', 'eyJ', REG_JWT),
+            ('Private Key', REG_PRIVATE_KEY, REG_PRIVATE_KEY)),
+        email=REG_EMAIL,
+        ip=REG_IP,
+        todo=REG_TODO,
+        sinks=REG_DOM_SINK,
+        interpolation=_RE_INTERP)
+
+    def __is_path(self, entry):
+        return (
+            '/' in entry                           # Possible Path
+            and len(entry) > 2                     # Min Length
+            and len(entry) < 100                   # Max Length
+            and self.__has_no_bad_char(entry)      # Filter
+            and entry not in self.ignore_list      # Black List
+            and not entry.endswith('.css')         # Exclude CSS files
+            and not entry.endswith('.otf')
+            and not entry.endswith('.woff')
+            and not entry.endswith('.woff2')
+            and not entry.endswith('.ico')
+        )
+
+    def __get_paths(self, candidates):
+        data = sorted(candidates)
         if len(data):
             self._log(f'{self.CYAN}Available Paths\n---------------{self.WHITE}')
         else:
             self._log(f'The extraction process yielded no viable {self.ORANGE}paths{self.WHITE}')
         return self.__extract_paths(data)
 
-    def __pretty_entry(self, entry):
+    def __pretty_entry(self, entry, colour=''):
         return entry.replace("{", "\n").replace("[", "\n").replace(", ", "\n") \
             .replace(",", "\n").replace("}", "").replace("]", "") \
-            .replace("=\n", f'{self.GREEN}\n').replace(":\n", f'{self.GREEN}\n') \
+            .replace("=\n", f'{colour}\n').replace(":\n", f'{colour}\n') \
             .replace('"', '').replace("'", "")
 
     def __map_objects(self, objects):
-        mapped = {k:[] for k in self.SECTIONS}
+        mapped = {k:[] for k in self.sections}
         for o in objects:
-            for section in self.SECTIONS:
+            for section in self.sections:
                 if section.lower() in o.lower() and o not in mapped[section]:
                     mapped[section].append(o)
                     break
         return mapped
 
-    def __print_objects(self, objects, js, js_file=""):
+    def __print_objects(self, objects, candidates, js_file=""):
         extracted_objects = 0
         mapped_objects = self.__map_objects(objects)
         for section in mapped_objects.keys():
@@ -238,15 +203,10 @@ class Analysis:
                 self._log(f'\n{title}')
                 self._log('-' * (len(title) - 14) +  self.WHITE)
                 for o in mapped_objects[section]:
-                    entry = self.__pretty_entry(o)
-                    self._log(f'{self.YELLOW}{entry}{self.WHITE}\n')
-                    # Collect for HTML report
-                    if hasattr(self, 'html_data'):
-                        if 'objects' not in self.html_data:
-                            self.html_data['objects'] = {}
-                        if section not in self.html_data['objects']:
-                            self.html_data['objects'][section] = []
-                        self.html_data['objects'][section].append({'value': self.__strip_ansi(entry), 'file': js_file})
+                    self.__emit(
+                        self.__pretty_entry(o, self.GREEN), self.YELLOW, 'objects', js_file,
+                        group=section, plain=self.__pretty_entry(o))
+                    self._log('')
                     extracted_objects += 1
         
         # Warn - no useful data was found.
@@ -254,10 +214,10 @@ class Analysis:
             self._log(f'\nThe extraction process yielded no viable {self.ORANGE}objects{self.WHITE}\n')
         
         # Look for paths.
-        return self.__print_paths(js, js_file)
+        return self.__print_paths(candidates, js_file)
 
-    def __print_paths(self, js, js_file=''):
-        paths_dict = self.__get_paths(js)
+    def __print_paths(self, candidates, js_file=''):
+        paths_dict = self.__get_paths(candidates)
         for k, paths in paths_dict.items():
             # Check for exclusion
             # normalize key for comparison (e.g. 'JS Files' -> 'js')
@@ -266,46 +226,24 @@ class Analysis:
                 
             self._log(f'{self.YELLOW}{k} {self.WHITE}(Total paths: {len(paths)})')
             for path in sorted(paths):
-                self._log(f'{self.GREEN}{path}{self.WHITE}')
-                # Collect for HTML report
-                if hasattr(self, 'html_data'):
-                    if k not in self.html_data['paths']:
-                        self.html_data['paths'][k] = []
-                    self.html_data['paths'][k].append({'value': self.__strip_ansi(path), 'file': js_file})
+                self.__emit(path, self.GREEN, 'paths', js_file, group=k)
             self._log('')
         return paths_dict
     
-    def __extract_secrets(self, js, js_file=''):
-        secrets = []
-        secrets.extend([f'AWS Key: {x}' for x in re.findall(self.REG_AWS, js)])
-        secrets.extend([f'Google Key: {x}' for x in re.findall(self.REG_GOOGLE, js)])
-        secrets.extend([f'Stripe Key: {x}' for x in re.findall(self.REG_STRIPE, js)])
-        secrets.extend([f'JWT: {x}' for x in re.findall(self.REG_JWT, js)])
-        secrets.extend([f'Private Key: {x}' for x in re.findall(self.REG_PRIVATE_KEY, js)])
-        
+    def __print_secrets(self, secrets, js_file=''):
         if secrets:
             if 'secrets' not in self.no_log and 'keys' not in self.no_log:
                 self._log(f'{self.CYAN}Secrets & Keys\n--------------{self.WHITE}')
                 for secret in set(secrets):
-                    self._log(f'{self.RED}{secret}{self.WHITE}')
-                    # Collect for HTML report
-                    if hasattr(self, 'html_data'):
-                        self.html_data['secrets'].append({'value': self.__strip_ansi(secret), 'file': js_file})
+                    self.__emit(secret, self.RED, 'secrets', js_file)
                 self._log('')
             
-    def __extract_emails_ips(self, js, js_file=''):
-        # Email & IP
-        emails = re.findall(self.REG_EMAIL, js)
-        ips = re.findall(self.REG_IP, js)
-        
+    def __print_emails_ips(self, emails, ips, js_file=''):
         if emails:
             if 'emails' not in self.no_log:
                 self._log(f'{self.CYAN}Emails\n------{self.WHITE}')
                 for email in set(emails):
-                    self._log(f'{self.BLUE}{email}{self.WHITE}')
-                    # Collect for HTML report
-                    if hasattr(self, 'html_data'):
-                        self.html_data['emails'].append({'value': self.__strip_ansi(email), 'file': js_file})
+                    self.__emit(email, self.BLUE, 'emails', js_file)
                 self._log('')
             
         if ips:
@@ -320,67 +258,109 @@ class Analysis:
                 if 'ips' not in self.no_log:
                     self._log(f'{self.CYAN}IP Addresses\n------------{self.WHITE}')
                     for ip in sorted(valid_ips):
-                        self._log(f'{self.ORANGE}{ip}{self.WHITE}')
-                        # Collect for HTML report
-                        if hasattr(self, 'html_data'):
-                            self.html_data['ips'].append({'value': self.__strip_ansi(ip), 'file': js_file})
+                        self.__emit(ip, self.ORANGE, 'ips', js_file)
                     self._log('')
 
-    def __extract_comments(self, js, js_file=''):
-        todos = re.findall(self.REG_TODO, js)
-        if todos:
-             # re.findall with group returns only the group, we want the whole match or we need to adjust regex
-             # Adjusting regex to capture the full line might be safer or just iterate
-             # Let's re-run with finding full match
-             comments = re.findall(r'(//\s*(?:TODO|FIXME|HACK|XXX).*)', js)
-             if comments:
-                if 'comments' not in self.no_log and 'todos' not in self.no_log:
-                    self._log(f'{self.CYAN}Developer Comments\n------------------{self.WHITE}')
-                    for comment in set(comments):
-                        self._log(f'{self.YELLOW}{comment.strip()}{self.WHITE}')
-                        # Collect for HTML report
-                        if hasattr(self, 'html_data'):
-                            self.html_data['comments'].append({'value': self.__strip_ansi(comment.strip()), 'file': js_file})
-                    self._log('')
+    def __print_comments(self, comments, js_file=''):
+        if comments:
+            if 'comments' not in self.no_log and 'todos' not in self.no_log:
+                self._log(f'{self.CYAN}Developer Comments\n------------------{self.WHITE}')
+                for comment in set(comments):
+                    self.__emit(comment.strip(), self.YELLOW, 'comments', js_file)
+                self._log('')
 
-    def __extract_sinks(self, js, js_file=''):
-        sinks = re.findall(self.REG_DOM_SINK, js)
+    def __print_sinks(self, sinks, js_file=''):
         if sinks:
             if 'sinks' not in self.no_log and 'dangerous' not in self.no_log:
                 self._log(f'{self.CYAN}Dangerous Functions (DOM Sinks)\n-------------------------------{self.WHITE}')
                 for sink in sorted(set(sinks)):
-                    self._log(f'{self.RED}{sink}{self.WHITE}')
-                    # Collect for HTML report
-                    if hasattr(self, 'html_data'):
-                        self.html_data['sinks'].append({'value': self.__strip_ansi(sink), 'file': js_file})
+                    self.__emit(sink, self.RED, 'sinks', js_file)
                 self._log('')
 
-    def __parse_js(self, js_file):
+    def __print_chunks(self, chunks, js_file=''):
+        """Chunk URLs of a bundle's runtime (plugins/chunks.py), listed with the paths."""
+        urls = sorted({resolve_chunk(js_file, chunk) for chunk in chunks})
+        if urls and not any(x in 'js chunks' for x in self.no_log):
+            self._log(f'{self.YELLOW}JS Chunks {self.WHITE}(Total chunks: {len(urls)})')
+            for url in urls:
+                self.__emit(url, self.GREEN, 'paths', js_file, group='JS Chunks')
+            self._log('')
+        return urls
+
+    def __read_js(self, js_file, digest=None):
+        """Decoded chunks of a JS source, the raw bytes are also fed to digest."""
+        if os.path.exists(js_file) and not js_file.startswith(('http:', 'https:')):
+            with open(js_file, 'rb') as f:
+                yield from decode_stream(_hashed(iter(lambda: f.read(self.CHUNK_SIZE), b''), digest), {})
+        else:
+            with self._stream_page_source(js_file) as res:
+                yield from decode_stream(_hashed(res.iter_content(self.CHUNK_SIZE), digest), res.headers)
+
+    def __scan_js(self, js_file):
+        """(findings, path-like strings) of a JS source, reused if its content was scanned before."""
+        if not self.findings:
+            return _collect(self.SCANNER.stream(self.scanners), self.__read_js(js_file))
+        # The source is read once to hash it and again from the spool to scan it.
+        with tempfile.SpooledTemporaryFile(self.SPOOL_SIZE, 'w+', encoding='utf-8', newline='') as spool:
+            digest = hashlib.sha256()
+            for chunk in self.__read_js(js_file, digest):
+                spool.write(chunk)
+            digest = digest.hexdigest()
+            scanned = self.findings.load(digest)
+            if scanned is None:
+                spool.seek(0)
+                chunks = iter(lambda: spool.read(self.CHUNK_SIZE), '')
+                scanned = _collect(self.SCANNER.stream(self.scanners), chunks)
+                self.findings.save(digest, *scanned)
+        return scanned
+
+    def __parse_js(self, js_file, scanned=None):
         self._log(f'Fetching {self.CYAN}{js_file}{self.WHITE}')
         
         # Track parsed files for HTML report
         if hasattr(self, 'html_data') and js_file not in self.html_data ['parsed_files']:
             self.html_data['parsed_files'].append(js_file)
+        if getattr(self, 'store', None):
+            self.store.add(self.base, 'js', js_file)
         
-        content = ""
-        if os.path.exists(js_file) and not js_file.startswith(('http:', 'https:')):
-             with open(js_file, 'r', encoding='utf-8', errors='ignore') as f:
-                 content = f.read()
-        else:
-             content = self._get_page_source(js_file).text
+        found, strings = self.__scan_js(js_file) if scanned is None else scanned
+        candidates = {s for s in strings if self.__is_path(s)}
 
-        js = content
-        
         # New Extractions - pass js_file for tracking
-        self.__extract_secrets(js, js_file)
-        self.__extract_emails_ips(js, js_file)
-        self.__extract_comments(js, js_file)
-        self.__extract_sinks(js, js_file)
-        
-        objects = re.findall(self.REG_O, js) + re.findall(self.REG_L, js)
-        return self.__print_objects(set(objects), js, js_file)
+        self.__print_secrets(found['secrets'], js_file)
+        self.__print_emails_ips(found['emails'], found['ips'], js_file)
+        self.__print_comments(found['comments'], js_file)
+        self.__print_sinks(found['sinks'], js_file)
+
+        paths_found = self.__print_objects(set(found['objects']), candidates, js_file)
+        chunks = self.__print_chunks(found.get('chunks', []), js_file)
+        if chunks:
+            paths_found['JS Chunks'] = chunks
+        return paths_found
     
+    def __schedule(self, js_queue, visited, scheduled, submit):
+        # Keep the next files of the queue fetching and scanning.
+        for js_file in js_queue:
+            if len(scheduled) >= 2 * self.threads:
+                break
+            if (
+                js_file in visited or js_file in scheduled
+                    or (self.mainonly and 'main' not in js_file)):
+                continue
+            scheduled[js_file] = submit(js_file)
+
     def __parse_all_js_files(self):
+        if not self.auto:
+            return self.__walk_js_files()
+        # No prompts in auto mode: files are fetched and scanned ahead on
+        # the thread pool (large ones partly in the worker processes),
+        # results are still reported in queue order.
+        with ThreadPoolExecutor(max_workers=self.threads) as fetchers:
+            self.__walk_js_files(
+                lambda js_file: fetchers.submit(self.__scan_js, js_file))
+
+    def __walk_js_files(self, submit=None):
+        scheduled = {}
         js_queue = []
         visited = set()
 
@@ -390,6 +370,8 @@ class Analysis:
                 js_queue.append(js_file)
 
         while js_queue:
+            if submit:
+                self.__schedule(js_queue, visited, scheduled, submit)
             js_file = js_queue.pop(0)
             
             if self.mainonly and 'main' not in js_file:
@@ -408,18 +390,20 @@ class Analysis:
                 to_parse_it = input('\nParse this file? y/N: ')
                 
             if to_parse_it.strip().lower() in ('y', 'yes'):
-                paths_found = self.__parse_js(js_file)
+                scanned = scheduled.pop(js_file).result() if submit else None
+                paths_found = self.__parse_js(js_file, scanned)
                 
                 if self.continuous and paths_found:
-                    # Check for new JS files
-                    js_files = paths_found.get('JS Files', [])
+                    # Check for new JS files, all chunks of a runtime are queued at once
+                    # and fetched together in auto mode.
+                    js_files = list(paths_found.get('JS Files', [])) + paths_found.get('JS Chunks', [])
                     new_candidates = []
                     
                     for raw_path in js_files:
                         # Smart resolve
                         full_path = self._process_path(js_file, raw_path)
                         
-                        if full_path not in visited and full_path not in js_queue:
+                        if full_path not in visited and full_path not in js_queue and full_path not in new_candidates:
                              new_candidates.append(full_path)
                     
                     if new_candidates:
@@ -441,19 +425,41 @@ class Analysis:
             'objects': {},
             'paths': {}
         }
-        
-        if not self.base.startswith(('http:', 'https:')) and os.path.exists(self.base):
-             self.__parse_js(self.base)
-             # Generate HTML report if requested
-             if hasattr(self, 'html_output') and self.html_output:
-                 self.__generate_html_report()
-             return
-
-        if '.js' in self.base or self.strict:
-            self.__parse_js(self.base)
-        else:
-            self.__parse_all_js_files()
-        
+
+        # User rules are checked before the built-in ones.
+        rule_files = [self.path_rules_file] if self.path_rules_file else []
+        self.path_rules = PathClassifier.from_files(*rule_files, self.PATH_RULES_FILE)
+        self.ignore_list = IgnoreList.from_files(self.IGNORE_LIST_FILE, *self.ignore_files)
+        self.sections = read_lines(self.SECTIONS_FILE)
+
+        # Collected and appended in one piece when the run ends, so that
+        # targets analyzed in parallel do not interleave in the file.
+        self.output = io.StringIO() if self.output_file else None
+        self.scanners = self.scanner_pool()
+        # Unchanged bundles reuse stored results, findings missing from the
+        # previous run on this target are marked as new.
+        self.findings = None
+        self.previous = None
+        self.reported = set()
+        self.store = ResultStore(self.db) if self.db else None
+        if not self.no_cache:
+            self.findings = FindingsStore(os.path.join(self.cache_dir, 'findings'))
+            self.previous = self.findings.previous(self.base)
+        try:
+            is_local = not self.base.startswith(('http:', 'https:')) and os.path.exists(self.base)
+            if is_local or '.js' in self.base or self.strict:
+                self.__parse_js(self.base)
+            else:
+                self.__parse_all_js_files()
+        finally:
+            if self.output:
+                with self.OUTPUT_LOCK, open(self.output_file, 'a+', encoding='utf-8', errors='ignore') as f:
+                    f.write(self.output.getvalue())
+            if self.store:
+                self.store.close()
+        if self.findings:
+            self.findings.record(self.base, self.reported)
+
         # Generate HTML report if requested
         if hasattr(self, 'html_output') and self.html_output:
             self.__generate_html_report()
@@ -780,6 +786,18 @@ class Analysis:
             box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.2);
             text-transform: lowercase;
         }}
+        .new-tag {{
+            position: absolute;
+            top: -10px;
+            left: 20px;
+            font-size: 11px;
+            font-weight: 700;
+            color: #0f172a;
+            background: #4ade80;
+            padding: 4px 10px;
+            border-radius: 8px;
+            text-transform: uppercase;
+        }}
 
         .item.secret {{ border-left: 4px solid var(--accent-tertiary); }}
         .item.email {{ border-left: 4px solid #f59e0b; }}
@@ -1107,6 +1125,12 @@ class Analysis:
                     tag.textContent = item.file.split('/').pop();
                     iDiv.appendChild(tag);
                 }}
+                if (item.new) {{
+                    const badge = document.createElement('span');
+                    badge.className = 'new-tag';
+                    badge.textContent = 'new';
+                    iDiv.appendChild(badge);
+                }}
                 div.appendChild(iDiv);
             }});
             document.getElementById('results-container').appendChild(div);
@@ -1122,3 +1146,22 @@ class Analysis:
             f.write(html_template)
         print(f'{self.GREEN}✓ HTML report generated: {self.html_output}{self.WHITE}')
 
+
+def _hashed(chunks, digest):
+    for chunk in chunks:
+        if digest:
+            digest.update(chunk)
+        yield chunk
+
+
+def _collect(stream, chunks):
+    """Feed chunks through a ScanStream, return its findings (with the bundle's chunks) and the literals that may be paths."""
+    strings = set()
+    finder = ChunkFinder()
+    for chunk in chunks:
+        finder.feed(chunk)
+        strings.update(s for s in stream.feed(chunk) if '/' in s and len(s) < 100)
+    found, rest = stream.close()
+    strings.update(s for s in rest if '/' in s and len(s) < 100)
+    found['chunks'] = finder.close()
+    return found, strings
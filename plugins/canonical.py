@@ -0,0 +1,94 @@
+import re
+from urllib.parse import unquote_plus, urlsplit, urlunsplit
+
+from plugins.paths import IgnoreList, data_file, read_lines
+
+
+class URLCanonicalizer:
+    """Rewrites equivalent URLs to one form, so that each is crawled and logged once.
+
+    The fragment is always removed. Other rules can be switched off:
+      case      lower-case scheme and host
+      ports     drop :80 for http and :443 for https
+      percent   upper-case %xx escapes, decode escaped unreserved characters
+      slash     drop a trailing slash, except for the root path
+      sort      sort query parameters
+      tracking  drop query parameters listed in utils/tracking_params.txt
+      https     treat http:// URLs as https:// (off by default)
+    Strings that are not absolute URLs only lose their fragment.
+    """
+
+    RULES = ('case', 'ports', 'percent', 'slash', 'sort', 'tracking', 'https')
+    DEFAULT_RULES = ('case', 'ports', 'percent', 'slash', 'sort', 'tracking')
+    TRACKING_PARAMS_FILE = data_file('tracking_params.txt')
+    DEFAULT_PORTS = {'http': '80', 'https': '443'}
+    UNRESERVED = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~')
+
+    _RE_ESCAPE = re.compile(r'%([0-9A-Fa-f]{2})')
+
+    def __init__(self, rules=DEFAULT_RULES, tracking_params=None):
+        unknown = set(rules) - set(self.RULES)
+        if unknown:
+            raise ValueError(f'Unknown canonicalization rule(s): {", ".join(sorted(unknown))}')
+        self.rules = frozenset(rules)
+        if tracking_params is None and 'tracking' in self.rules:
+            tracking_params = read_lines(self.TRACKING_PARAMS_FILE)
+        self.tracking = IgnoreList(p.strip().lower() for p in tracking_params or [])
+
+    @classmethod
+    def from_option(cls, option):
+        """Canonicalizer for a --canonicalize value: comma separated rules, 'none' or None for the default."""
+        if option is None:
+            return cls()
+        rules = [r.strip().lower() for r in option.split(',') if r.strip()]
+        return cls([] if rules == ['none'] else rules)
+
+    def __escape(self, m):
+        char = chr(int(m.group(1), 16))
+        return char if char in self.UNRESERVED else '%' + m.group(1).upper()
+
+    def __netloc(self, scheme, netloc):
+        userinfo, at, hostport = netloc.rpartition('@')
+        host, port = hostport, ''
+        if ':' in hostport and not hostport.endswith(']'):
+            host, _, port = hostport.rpartition(':')
+        if 'case' in self.rules:
+            host = host.lower()
+        if 'ports' in self.rules and self.DEFAULT_PORTS.get(scheme) == port:
+            port = ''
+        return f'{userinfo}{at}{host}{":" if port else ""}{port}', port
+
+    def __query(self, query):
+        params = [p for p in query.split('&') if p]
+        if 'tracking' in self.rules:
+            params = [
+                p for p in params
+                if unquote_plus(p.partition('=')[0]).lower() not in self.tracking]
+        if 'sort' in self.rules:
+            params.sort()
+        return '&'.join(params)
+
+    def __call__(self, url):
+        url = url.split('#', 1)[0]
+        if not self.rules:
+            return url
+        try:
+            scheme, netloc, path, query, _ = urlsplit(url)
+        except ValueError:
+            return url
+        if not scheme or not netloc:
+            return url
+        if 'case' in self.rules:
+            scheme = scheme.lower()
+        netloc, port = self.__netloc(scheme.lower(), netloc)
+        # Only without an explicit port, which belongs to the original scheme.
+        if 'https' in self.rules and scheme.lower() == 'http' and not port:
+            scheme = 'https'
+        if 'percent' in self.rules:
+            path = self._RE_ESCAPE.sub(self.__escape, path)
+            query = self._RE_ESCAPE.sub(self.__escape, query)
+        if 'slash' in self.rules:
+            path = path.rstrip('/') or '/'
+        if query:
+            query = self.__query(query)
+        return urlunsplit((scheme, netloc, path, query, ''))
@@ -0,0 +1,377 @@
+import json
+import re
+from urllib.parse import urljoin, urlparse
+
+
+class ChunkExpression:
+    """The chunk file name function of a webpack runtime, evaluated without running it.
+
+    Handles what webpack emits for it: string and number literals, the
+    chunk id parameter, {id: value}[id] lookups, +, ||, ===/!== and ?:.
+    Other variables, such as the public path, are empty strings; the
+    public path is resolved separately. Expressions nested deeper than
+    MAX_DEPTH are not parsed.
+    """
+
+    MAX_DEPTH = 64
+
+    _RE_TOKEN = re.compile(r'''
+        \s+|//[^\n]*|/\*.*?\*/
+        |(?P<str>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|`(?:[^`\\$]|\\.)*`)
+        |(?P<num>\d+(?:\.\d+)?)
+        |(?P<name>[A-Za-z_$][\w$]*(?:\.[A-Za-z_$][\w$]*)*)
+        |(?P<op>===|!==|==|!=|\|\||=>|[-+?:,()\[\]{}!;])
+    ''', re.S | re.X)
+
+    def __init__(self, param, tokens):
+        self.param = param
+        self.tokens = tokens
+        self.pos = 0
+        self.depth = 0
+        # Object literals indexed by the parameter, their keys are the chunk ids.
+        self.maps = []
+        self.compared = []
+        self.tree = self.__conditional()
+
+    @classmethod
+    def parse(cls, param, js, start):
+        """Expression of the function body returned at js[start:], None if it is not one."""
+        tokens = []
+        depth = 0
+        for m in cls._RE_TOKEN.finditer(js, start):
+            kind = m.lastgroup
+            if kind is None:
+                if m.group().strip():
+                    break
+                continue
+            value = m.group(kind)
+            if kind == 'op':
+                if value in '([{':
+                    depth += 1
+                elif value in ')]}':
+                    depth -= 1
+                if depth < 0 or (depth == 0 and value in (';', ',')):
+                    break
+            tokens.append((kind, value))
+            if len(tokens) > 1 << 16:
+                return None
+        else:
+            return None
+        if tokens[:2] == [('op', '{'), ('name', 'return')]:
+            tokens = tokens[2:]
+        try:
+            return cls(param, tokens)
+        except (IndexError, ValueError, RecursionError):
+            return None
+
+    def __peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def __take(self, value=None):
+        kind, token = self.tokens[self.pos]
+        if value is not None and token != value:
+            raise ValueError(token)
+        self.pos += 1
+        return kind, token
+
+    def __conditional(self):
+        # Every nested (), [], {}, ?: and ! goes through here.
+        self.depth += 1
+        if self.depth > self.MAX_DEPTH:
+            raise ValueError('expression nested too deep')
+        test = self.__or()
+        if self.__peek()[1] == '?':
+            self.__take('?')
+            then = self.__conditional()
+            self.__take(':')
+            test = ('cond', test, then, self.__conditional())
+        self.depth -= 1
+        return test
+
+    def __or(self):
+        terms = [self.__equality()]
+        while self.__peek()[1] == '||':
+            self.__take()
+            terms.append(self.__equality())
+        return terms[0] if len(terms) == 1 else ('or', terms)
+
+    def __equality(self):
+        node = self.__sum()
+        if self.__peek()[1] in ('===', '!==', '==', '!='):
+            _, op = self.__take()
+            other = self.__sum()
+            for a, b in ((node, other), (other, node)):
+                if a == ('var', self.param) and b[0] in ('str', 'num'):
+                    self.compared.append(b[1])
+            node = ('eq', op.startswith('!'), node, other)
+        return node
+
+    def __sum(self):
+        terms = [self.__unary()]
+        while self.__peek()[1] == '+':
+            self.__take()
+            terms.append(self.__unary())
+        return terms[0] if len(terms) == 1 else ('add', terms)
+
+    def __unary(self):
+        if self.__peek()[1] == '!':
+            self.__take()
+            return ('not', self.__conditional_operand())
+        return self.__member(self.__primary())
+
+    def __conditional_operand(self):
+        self.depth += 1
+        if self.depth > self.MAX_DEPTH:
+            raise ValueError('expression nested too deep')
+        node = self.__unary()
+        self.depth -= 1
+        return node
+
+    def __member(self, node):
+        while self.__peek()[1] == '[':
+            self.__take()
+            key = self.__conditional()
+            self.__take(']')
+            if node[0] == 'obj' and key == ('var', self.param):
+                self.maps.append(node[1])
+            node = ('index', node, key)
+        return node
+
+    def __primary(self):
+        kind, token = self.__take()
+        if kind == 'str':
+            return ('str', _unquote(token))
+        if kind == 'num':
+            return ('num', float(token))
+        if kind == 'name':
+            return ('var', token)
+        if token == '(':
+            node = self.__conditional()
+            self.__take(')')
+            return node
+        if token == '{':
+            return ('obj', self.__object())
+        raise ValueError(token)
+
+    def __object(self):
+        entries = {}
+        while self.__peek()[1] != '}':
+            kind, key = self.__take()
+            if kind == 'str':
+                key = _unquote(key)
+            elif kind == 'num':
+                key = _js_str(float(key))
+            self.__take(':')
+            entries[key] = self.__conditional()
+            if self.__peek()[1] == ',':
+                self.__take()
+        self.__take('}')
+        return entries
+
+    def ids(self):
+        ids = {key for entries in self.maps for key in entries}
+        ids.update(_js_str(value) for value in self.compared)
+        return sorted(ids, key=lambda i: (not i.isdigit(), int(i) if i.isdigit() else 0, i))
+
+    def evaluate(self, chunk_id):
+        """File name of a chunk, None if the runtime has no entry for it."""
+        try:
+            value = self.__eval(self.tree, float(chunk_id) if chunk_id.isdigit() else chunk_id)
+        except RecursionError:
+            return None
+        if not isinstance(value, str) or 'undefined' in value:
+            return None
+        return value
+
+    def __eval(self, node, chunk_id):
+        kind = node[0]
+        if kind in ('str', 'num'):
+            return node[1]
+        if kind == 'var':
+            return chunk_id if node[1] == self.param else ''
+        if kind == 'obj':
+            return node[1]
+        if kind == 'index':
+            entries = self.__eval(node[1], chunk_id)
+            if not isinstance(entries, dict):
+                return None
+            value = entries.get(_js_str(self.__eval(node[2], chunk_id)))
+            return None if value is None else self.__eval(value, chunk_id)
+        if kind == 'add':
+            value = self.__eval(node[1][0], chunk_id)
+            for term in node[1][1:]:
+                b = self.__eval(term, chunk_id)
+                if isinstance(value, float) and isinstance(b, float):
+                    value += b
+                else:
+                    value = _js_str(value) + _js_str(b)
+            return value
+        if kind == 'or':
+            for term in node[1]:
+                value = self.__eval(term, chunk_id)
+                if value:
+                    break
+            return value
+        if kind == 'not':
+            return not self.__eval(node[1], chunk_id)
+        if kind == 'eq':
+            equal = self.__eval(node[2], chunk_id) == self.__eval(node[3], chunk_id)
+            return equal != node[1]
+        test = self.__eval(node[1], chunk_id)
+        return self.__eval(node[2] if test else node[3], chunk_id)
+
+
+def _unquote(token):
+    body = token[1:-1]
+    if '\\' not in body:
+        return body
+    try:
+        return json.loads('"' + body.replace('"', '\\"').replace("\\'", "'") + '"')
+    except ValueError:
+        return body
+
+
+def _js_str(value):
+    if value is None:
+        return 'undefined'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else str(value)
+    return str(value)
+
+
+# Each starts with a literal, which keeps the search fast on large bundles.
+# webpack 5: __webpack_require__.u = chunkId => ..., webpack 4: jsonpScriptSrc(chunkId) { return __webpack_require__.p + ... }
+_RE_WEBPACK = (
+    re.compile(r'\.u\s*=\s*(?:function\s*\(\s*([\w$]+)\s*\)\s*\{\s*return\b|\(?\s*([\w$]+)\s*\)?\s*=>)'),
+    re.compile(r'function\s+[\w$]+\s*\(\s*([\w$]+)\s*\)\s*\{\s*return\s+[\w$]+\.p\s*\+'))
+_RE_PUBLIC_PATH = re.compile(r'\.p\s*=\s*(["\'])([^"\'{}]*)\1')
+_RE_VITE_DEPS = re.compile(r'(?:__vite__fileDeps|\.f)\s*=\s*\[([^\]]*)\]')
+_RE_STRING = re.compile(r'"((?:[^"\\\n]|\\.)*)"|\'((?:[^\'\\\n]|\\.)*)\'')
+_RE_IMPORT = re.compile(r'import\(\s*(["\'`])([^"\'`\s]+?\.m?js)\1\s*\)')
+JS_EXTENSIONS = ('.js', '.mjs')
+
+
+class ChunkFinder:
+    """find_chunks() over a source that arrives in chunks.
+
+    At most about 2 * WINDOW characters are held: matches that start
+    before the last WINDOW characters are read and the text before that
+    point is dropped, so a chunk map or dependency list has to fit in
+    WINDOW characters (a map of 300 chunks takes about 20k).
+    """
+
+    WINDOW = 1 << 18
+
+    def __init__(self):
+        self.pending = []
+        self.size = 0
+        self.public_path = None
+        self.webpack = []
+        self.vite = []
+        self.imports = []
+        self.vite_map = False
+
+    def feed(self, chunk):
+        self.pending.append(chunk)
+        self.size += len(chunk)
+        if self.size >= 2 * self.WINDOW:
+            js = ''.join(self.pending)
+            cut = len(js) - self.WINDOW
+            self.__find(js, cut)
+            js = js[cut:]
+            self.pending = [js]
+            self.size = len(js)
+
+    def close(self):
+        """Chunk paths of the whole source, see find_chunks."""
+        self.__find(''.join(self.pending), None)
+        self.pending = []
+        self.size = 0
+        public_path = ''
+        # 'auto' and relative public paths depend on where the runtime is loaded from.
+        if self.public_path and self.public_path.startswith(('/', 'http:', 'https:')):
+            public_path = self.public_path
+        chunks = [public_path + name for name in self.webpack]
+        if self.vite_map:
+            chunks.extend(self.vite)
+        chunks.extend(self.imports)
+        return list(dict.fromkeys(chunks))
+
+    @staticmethod
+    def __matches(regex, js, end):
+        for m in regex.finditer(js):
+            if end is not None and m.start() >= end:
+                break
+            yield m
+
+    def __find(self, js, end):
+        """Read the matches that start in js[:end] (all of js if end is None)."""
+        if self.public_path is None:
+            m = _RE_PUBLIC_PATH.search(js)
+            if m and (end is None or m.start() < end):
+                self.public_path = m.group(2)
+        for regex in _RE_WEBPACK:
+            for m in self.__matches(regex, js, end):
+                param = next(g for g in m.groups() if g)
+                expression = ChunkExpression.parse(param, js, m.end())
+                if expression is None:
+                    continue
+                for chunk_id in expression.ids():
+                    name = expression.evaluate(chunk_id)
+                    if name and urlparse(name).path.endswith(JS_EXTENSIONS):
+                        self.webpack.append(name)
+        if not self.vite_map:
+            position = js.find('__vite__mapDeps')
+            self.vite_map = position >= 0 and (end is None or position < end)
+        for m in self.__matches(_RE_VITE_DEPS, js, end):
+            for a, b in _RE_STRING.findall(m.group(1)):
+                path = a or b
+                if path.endswith(JS_EXTENSIONS):
+                    self.vite.append(path)
+        self.imports.extend(m.group(2) for m in self.__matches(_RE_IMPORT, js, end))
+
+
+def find_chunks(js):
+    """Chunk files a bundle can load, as written in it (relative to its public path or to itself).
+
+    Covers the webpack chunk file name function (all ids of its hash
+    maps), Vite's __vite__mapDeps list and import() calls with a literal
+    path.
+    """
+    finder = ChunkFinder()
+    finder.feed(js)
+    return finder.close()
+
+
+def import_map_urls(text):
+    """Module URLs of an import map (<script type="importmap">), prefix mappings excluded."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return []
+    if not isinstance(data, dict):
+        return []
+    maps = [data.get('imports')] + list((data.get('scopes') or {}).values())
+    return [
+        url for entries in maps if isinstance(entries, dict)
+        for url in entries.values() if isinstance(url, str) and not url.endswith('/')]
+
+
+def resolve_chunk(base, path):
+    """URL of a chunk path found in base.
+
+    Paths like 'static/js/1.chunk.js' are relative to the public path,
+    usually the directory above the runtime (/static/js/runtime.js), so a
+    leading part that repeats the end of base's directory is not doubled.
+    """
+    if path.startswith(('http:', 'https:', '//', '/', './', '../')):
+        return urljoin(base, path)
+    directory = urlparse(base).path.rsplit('/', 1)[0] + '/'
+    parts = path.split('/')[:-1]
+    for n in range(len(parts), 0, -1):
+        prefix = '/'.join(parts[:n]) + '/'
+        if directory.endswith('/' + prefix):
+            return urljoin(base, directory[:-len(prefix)] + path)
+    return urljoin(base, path)
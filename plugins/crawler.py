@@ -1,22 +1,26 @@
-from collections import deque
+import asyncio
 from concurrent.futures import ThreadPoolExecutor
+import json
+import os
 from pathlib import Path
 import re
 from threading import Lock
 from urllib.parse import urlparse, unquote
 
-from bs4 import BeautifulSoup as bs
 from requests import ConnectionError
 
+from mixins.journal import CrawlJournal
+from mixins.sink import OutputSink
+from mixins.store import ResultStore
+from plugins.links import extract_links
 
-class Crawler:
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
 
-    URLS = {
-        'internal': set(),
-        'external': set(),
-        'visited': set(),
-        'not_visited': deque([])
-    }
+
+class Crawler:
 
     DIRS = {
         'general': '1. General',
@@ -31,87 +35,81 @@ class Crawler:
     EMAIL_REG = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
 
     LOCK = Lock()
-    LOGGED_URLS = {}
-
-    def _normalize_url(self, url):
-        # Remove fragment (everything after and including '#')
-        return url.split('#', 1)[0]
+    # Log directories written by earlier targets of this run.
+    LOGGED_DOMAINS = set()
 
-    def __get_a_hrefs(self, url, soup):
-        for a in soup.find_all('a'):
-            path = a.get('href')
+    def __get_a_hrefs(self, url, links):
+        for path in links.hrefs:
             if path and path != '/':
                 yield self._process_path(url, path)
 
-    def __reg_extract_emails(self, text, emails=set()):
+    def __reg_extract_emails(self, text, source):
         for email in set(re.findall(self.EMAIL_REG, text)):
-            if email not in emails:
-                emails.add(email)
-                self.__write(email, self.DIRS['emails'])
+            if email not in self.emails:
+                self.emails.add(email)
+                self.__write(email, self.DIRS['emails'], source)
                 self.__print(f'{self.BLUE}EMAIL    :: {email}{self.WHITE}')
 
-    def __reg_extract_uls(self, text):
+    def __reg_extract_uls(self, text, source):
         for url in set(re.findall(self.URL_REG, text)):
             u = url.replace('\\', '')
-            if u not in self.URLS['visited']:
-                if urlparse(u).netloc in self.base:
-                    self._add_not_visited(u)
-                else:
-                    self.URLS['visited'].add(u)
-                    self.__write(u, self.DIRS['extracted'])
-                    self.__print(f'{self.ORANGE}EXTRACT  :: {u}{self.WHITE}')
-
-    def __get_script_sources(self, url, soup):
-        for script in soup.find_all('script'):
-            self.__reg_extract_uls(script.text)
-            path = script.get('src')
+            if urlparse(u).netloc in self.base:
+                self._add_not_visited(u, source)
+            elif self.frontier.mark_seen(u):
+                self.__write(u, self.DIRS['extracted'], source)
+                self.__print(f'{self.ORANGE}EXTRACT  :: {u}{self.WHITE}')
+
+    def __get_script_sources(self, url, links):
+        for path, text in links.scripts:
+            self.__reg_extract_uls(text, url)
             if path:
                 yield self._process_path(url, path)
 
-    def __get_form_actions(self, url, soup):
-        for form in soup.find_all('form'):
-            path = form.get('action')
+    def __get_form_actions(self, url, links):
+        for path in links.forms:
             if path:
                 yield self._process_path(url, path)
 
-    def __process_url(self, url):
-        url = self._normalize_url(url)
+    def __process_url(self, url, source):
         # Add to list of parametrized urls for future injection tests.
-        self.__write_parametrized(url)
+        self.__write_parametrized(url, source)
 
         # Continue crawling.
-        res = self._get_page_source(url)
+        page = self._fetch_page(url)
+        if page:
+            self.__process_page(url, *page)
 
+    def __process_page(self, url, content_type, html):
         # Case 1 - JSON
-        if 'application/json' in res.headers.get('Content-Type'):
-            return self.__reg_extract_uls(str(res.json()))
+        if 'application/json' in content_type:
+            try:
+                html = str(json.loads(html))
+            except ValueError:
+                # Cut by --max-page-size, or not JSON after all.
+                pass
+            return self.__reg_extract_uls(html, url)
 
         # Case 2 - HTML
-        html = res.text
-        soup = bs(html, 'html.parser')
+        links = extract_links(html, self.html_parser)
 
         # Tag <a>
-        for url in self.__get_a_hrefs(url, soup):
-            self._add_not_visited(url)
+        for link in self.__get_a_hrefs(url, links):
+            self._add_not_visited(link, url)
 
         # Tag <script>
-        for url in self.__get_script_sources(url, soup):
-            norm_url = self._normalize_url(url)
-            if norm_url not in self.URLS['visited']:
-                self.URLS['visited'].add(norm_url)
-                self.__write_script(norm_url)
+        for src in self.__get_script_sources(url, links):
+            norm_url = self._normalize_url(src)
+            if self.frontier.mark_seen(norm_url):
+                self.__write_script(norm_url, url)
 
         # Tag <form>
-        for url in self.__get_form_actions(url, soup):
-            norm_url = self._normalize_url(url)
-            if (
-                norm_url not in self.URLS['visited']
-                    and norm_url not in self.URLS['not_visited']):
+        for action in self.__get_form_actions(url, links):
+            norm_url = self._normalize_url(action)
+            if self._add_not_visited(action, url):
                 self.__print(f'{self.DARKCYAN}F-ACTION :: {norm_url}{self.WHITE}')
-                self._add_not_visited(norm_url)
 
         # Extract Emails
-        self.__reg_extract_emails(html)
+        self.__reg_extract_emails(html, url)
 
     def __get_dir(self, url):
         directories = urlparse(url).path.split('/')
@@ -120,41 +118,47 @@ class Crawler:
             return directories[1]
         return self.DIRS['general']
 
-    def __write(self, url, directory):
+    def __write(self, url, directory, source):
         url = self._normalize_url(unquote(url))
         directory = unquote(directory)
-        # Per-log-file deduplication
-        if directory not in self.LOGGED_URLS:
-            self.LOGGED_URLS[directory] = set()
-        if url in self.LOGGED_URLS[directory]:
-            return
-        self.LOGGED_URLS[directory].add(url)
-        filepath = Path(f'scans/{self.domain[0]}/{directory}.txt')
-        filepath.parent.mkdir(parents=True, exist_ok=True)
-        with open(filepath, 'a+', encoding='utf-8', errors='ignore') as f:
-            f.write(f'{url}\n')
+        # Deduplication per log file is done by the sink.
+        self.sink.write(Path(f'scans/{self.domain[0]}/{directory}.txt'), url)
+        if self.store:
+            kind = next((k for k, v in self.DIRS.items() if v == directory), None)
+            if kind:
+                self.store.add(self.base, kind, url, source)
+            else:
+                self.store.add(self.base, 'general', url, source, directory)
     
-    def __write_parametrized(self, url):
+    def __write_parametrized(self, url, source):
         parsed_url = urlparse(url)
         if '=' in parsed_url.query:
-            self.__write(url, self.DIRS['parametrized'])
+            self.__write(url, self.DIRS['parametrized'], source)
 
-    def __write_script(self, url):
-        self.__write(url, self.DIRS['js'])
+    def __write_script(self, url, source):
+        self.__write(url, self.DIRS['js'], source)
         self.__print(f'{self.CYAN}JS File  :: {url}{self.WHITE}')
 
-    def __thread(self):
-        url = self._add_visited()
-        if url in self.URLS['external']:
-            self.__write(url, self.DIRS['external'])
+    def __log_visit(self, url, source):
+        """Write the visited URL to its log file, return False for external URLs."""
+        url = self._normalize_url(url)
+        if self._is_external(url):
+            self.__write(url, self.DIRS['external'], source)
             self.__print(f'{self.YELLOW}EXTERNAL :: {url}{self.WHITE}')
-        else:
-            directory = self.__get_dir(url)
-            self.__write(url, directory)
+            return False
+        directory = self.__get_dir(url)
+        self.__write(url, directory, source)
+        # URLs the download gate skips are logged, but not requested.
+        if not self.gate.skip_url(url):
             self.__print(f'{self.GREEN}CRAWLING :: {url}{self.WHITE}')
+        return True
+
+    def __thread(self, url):
+        source = self.frontier.take_source(url)
+        if self.__log_visit(url, source):
             # if not 'logout' in url: # TODO
             try:
-                self.__process_url(url)
+                self.__process_url(url, source)
             except ConnectionError:
                 print(
                     f'{self.RED}ERROR    :: Failed to establish a new connection!{self.WHITE} ({url})')
@@ -162,15 +166,106 @@ class Crawler:
                 print(
                     f'{self.RED}ERROR    :: Failed to crawl!{self.WHITE} ({url})')
 
+    def __worker(self):
+        # Workers live for the whole crawl. The frontier is exhausted only
+        # when it is empty and no other worker can still add to it.
+        url = self.frontier.claim()
+        while url is not None:
+            try:
+                self.__thread(url)
+            finally:
+                self.frontier.done(url)
+            url = self.frontier.claim()
+
     def __print(self, output):
         self.LOCK.acquire()
         print(output)
         self.LOCK.release()
 
+    async def __task_async(self, session, url):
+        try:
+            source = self.frontier.take_source(url)
+            if self.__log_visit(url, source):
+                await self.__fetch_async(session, url, source)
+        finally:
+            self.frontier.done(url)
+
+    async def __fetch_async(self, session, url, source):
+        self.__write_parametrized(url, source)
+        if self.gate.skip_url(url):
+            return
+        try:
+            headers, html = await self.transport.get_async(
+                session, url, self.gate.accepts, self.gate.max_size)
+            head = html[:self.gate.CHUNK_SIZE].encode('utf-8', errors='replace')
+            if html and not self.gate.is_binary(headers, head):
+                self.__process_page(url, headers.get('Content-Type', ''), html)
+        except aiohttp.ClientConnectionError:
+            print(
+                f'{self.RED}ERROR    :: Failed to establish a new connection!{self.WHITE} ({url})')
+        except Exception:
+            print(
+                f'{self.RED}ERROR    :: Failed to crawl!{self.WHITE} ({url})')
+
+    async def __crawl_async(self):
+        # The frontier is fed continuously: a new request starts as soon as
+        # any in-flight one finishes, up to --threads at a time.
+        connector = aiohttp.TCPConnector(limit=self.threads)
+        timeout = aiohttp.ClientTimeout(total=self.transport.TIMEOUT)
+        async with aiohttp.ClientSession(
+                connector=connector, headers=self.headers, timeout=timeout,
+                cookie_jar=aiohttp.DummyCookieJar()) as session:
+            pending = set()
+            while True:
+                while len(pending) < self.threads:
+                    url = self.frontier.claim(wait=False)
+                    if url is None:
+                        break
+                    pending.add(asyncio.ensure_future(
+                        self.__task_async(session, url)))
+                if not pending:
+                    break
+                _, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+
     def crawl(self):
-        tmp = list(self.URLS['not_visited'])
-        while self.URLS['not_visited']:
-            with ThreadPoolExecutor(max_workers=self.threads) as executor:
-                for url in tmp:
-                    executor.submit(self.__thread)
-                tmp = list(self.URLS['not_visited'])
+        if self.engine == 'async' and aiohttp is None:
+            print(
+                f'{self.RED}The async engine requires aiohttp: pip3 install aiohttp{self.WHITE}')
+            return
+        # Every change of the frontier is journaled, --resume replays it.
+        self.journal = CrawlJournal(f'scans/{self.domain[0]}/.journal')
+        if self.resume and os.path.exists(self.journal.path):
+            visited = self._new_index()
+            pending = self.journal.load(visited, self._normalize_url)
+            self.__print(f'{self.YELLOW}RESUME   :: {len(visited)} visited, {len(pending)} queued{self.WHITE}')
+            self.frontier.restore(pending, visited)
+        else:
+            self.journal.start(self.frontier.queue)
+        self.frontier.journal = self.journal
+        # On resume, or after another target on this domain, the log files
+        # already hold lines to skip.
+        with self.LOCK:
+            logged = self.domain[0] in self.LOGGED_DOMAINS
+            self.LOGGED_DOMAINS.add(self.domain[0])
+        self.sink = OutputSink(self.resume or logged, self.frontier.seen)
+        self.emails = set()
+        self.store = ResultStore(self.db) if self.db else None
+        finished = False
+        try:
+            if self.engine == 'async':
+                asyncio.run(self.__crawl_async())
+            else:
+                with ThreadPoolExecutor(max_workers=self.threads) as executor:
+                    for _ in range(self.threads):
+                        executor.submit(self.__worker)
+            finished = not self.frontier
+        finally:
+            # Workers of an interrupted crawl stop claiming new URLs.
+            self.frontier.stop()
+            # Closed first: whatever it marks as done has reached the sink.
+            self.journal.close(finished)
+            self.sink.close()
+            if self.store:
+                self.store.close()
+            self.frontier.seen.close()
@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+from threading import get_ident
+
+
+class FindingsStore:
+    """Scanner results per JS content hash, and the findings of each target's last run.
+
+    A bundle whose content was scanned before is not scanned again. VERSION
+    is part of the path and has to change whenever the scanner output does.
+    """
+
+    VERSION = 2
+
+    def __init__(self, directory):
+        self.objects = os.path.join(directory, f'v{self.VERSION}')
+        self.runs = os.path.join(directory, 'runs')
+        os.makedirs(self.objects, exist_ok=True)
+        os.makedirs(self.runs, exist_ok=True)
+
+    def __write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{os.getpid()}-{get_ident()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def __read(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def __object(self, digest):
+        return os.path.join(self.objects, digest[:2], f'{digest}.json')
+
+    def load(self, digest):
+        """(findings, path-like strings) stored for this content, or None."""
+        data = self.__read(self.__object(digest))
+        if data is None:
+            return None
+        return data['found'], set(data['strings'])
+
+    def save(self, digest, found, strings):
+        self.__write(self.__object(digest), {'found': found, 'strings': sorted(strings)})
+
+    def __run(self, target):
+        return os.path.join(self.runs, f'{hashlib.sha256(target.encode()).hexdigest()}.json')
+
+    def previous(self, target):
+        """Set of (section, value) reported by the last run on target, None if there was none."""
+        data = self.__read(self.__run(target))
+        if data is None:
+            return None
+        return {tuple(finding) for finding in data['findings']}
+
+    def record(self, target, findings):
+        self.__write(self.__run(target), {'target': target, 'findings': sorted(findings)})
@@ -0,0 +1,176 @@
+from html.parser import HTMLParser
+import warnings
+
+try:
+    from bs4 import BeautifulSoup as bs, MarkupResemblesLocatorWarning
+except ImportError:
+    from bs4 import BeautifulSoup as bs
+    # Fallback if MarkupResemblesLocatorWarning is not available in older versions
+    MarkupResemblesLocatorWarning = None
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+if MarkupResemblesLocatorWarning:
+    warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
+
+
+class Links:
+    """What the crawler reads from a page, in document order.
+
+    hrefs: <a href> values, scripts: (src, text) per <script>,
+    forms: <form action> values. Missing attributes are None.
+    preloads: hrefs of <link rel="modulepreload"> and of script preloads,
+    import_maps: text of <script type="importmap">.
+    """
+
+    def __init__(self):
+        self.hrefs = []
+        self.scripts = []
+        self.forms = []
+        self.preloads = []
+        self.import_maps = []
+
+    def add_link(self, rel, as_, href):
+        rel = (rel or '').lower().split()
+        if href and ('modulepreload' in rel or ('preload' in rel and (as_ or '').lower() == 'script')):
+            self.preloads.append(href)
+
+    def add_script(self, src, type_, text):
+        self.scripts.append((src, text))
+        if (type_ or '').strip().lower() == 'importmap':
+            self.import_maps.append(text)
+
+
+class StdlibLinkExtractor(HTMLParser):
+    """Single pass over the HTML events, no tree is built.
+
+    BeautifulSoup's html.parser builder is driven by the same HTMLParser,
+    so attribute values (last duplicate wins, entities decoded) and script
+    text come out the same. The source can be fed in chunks.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = Links()
+        self.script = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            self.links.hrefs.append(self.__attr(attrs, 'href'))
+        elif tag == 'script':
+            self.__end_script()
+            self.script = [self.__attr(attrs, 'src'), self.__attr(attrs, 'type'), []]
+        elif tag == 'form':
+            self.links.forms.append(self.__attr(attrs, 'action'))
+        elif tag == 'link':
+            self.links.add_link(self.__attr(attrs, 'rel'), self.__attr(attrs, 'as'), self.__attr(attrs, 'href'))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag == 'script':
+            self.__end_script()
+
+    def handle_endtag(self, tag):
+        if tag == 'script':
+            self.__end_script()
+
+    def handle_data(self, data):
+        if self.script is not None:
+            self.script[2].append(data)
+
+    @staticmethod
+    def __attr(attrs, name):
+        value = None
+        for key, v in attrs:
+            if key == name:
+                value = v or ''
+        return value
+
+    def __end_script(self):
+        if self.script is not None:
+            self.links.add_script(self.script[0], self.script[1], ''.join(self.script[2]))
+            self.script = None
+
+    def close(self):
+        super().close()
+        self.__end_script()
+        return self.links
+
+
+class LxmlLinkExtractor:
+    """libxml2 pull parser, the fastest backend (requires lxml).
+
+    libxml2 repairs broken markup its own way, so on malformed pages the
+    result can differ from the other backends (e.g. the first of
+    duplicate attributes wins).
+    """
+
+    def __init__(self):
+        self.parser = etree.HTMLPullParser(events=('start', 'end'), tag=('a', 'script', 'form', 'link'))
+        self.links = Links()
+
+    def __read_events(self):
+        for event, element in self.parser.read_events():
+            tag = element.tag
+            if event == 'start':
+                if tag == 'a':
+                    self.links.hrefs.append(element.get('href'))
+                elif tag == 'form':
+                    self.links.forms.append(element.get('action'))
+                elif tag == 'link':
+                    self.links.add_link(element.get('rel'), element.get('as'), element.get('href'))
+            elif tag == 'script':
+                self.links.add_script(element.get('src'), element.get('type'), element.text or '')
+
+    def feed(self, data):
+        self.parser.feed(data)
+        self.__read_events()
+
+    def close(self):
+        self.parser.close()
+        self.__read_events()
+        return self.links
+
+
+class SoupLinkExtractor:
+    """The former BeautifulSoup tree walk, kept for comparison."""
+
+    def __init__(self):
+        self.parts = []
+
+    def feed(self, data):
+        self.parts.append(data)
+
+    def close(self):
+        soup = bs(''.join(self.parts), 'html.parser')
+        links = Links()
+        links.hrefs = [a.get('href') for a in soup.find_all('a')]
+        for s in soup.find_all('script'):
+            links.add_script(s.get('src'), s.get('type'), s.text)
+        links.forms = [f.get('action') for f in soup.find_all('form')]
+        for link in soup.find_all('link'):
+            rel = link.get('rel')
+            links.add_link(' '.join(rel) if isinstance(rel, list) else rel, link.get('as'), link.get('href'))
+        return links
+
+
+BACKENDS = {
+    'stdlib': StdlibLinkExtractor,
+    'lxml': LxmlLinkExtractor,
+    'bs4': SoupLinkExtractor
+}
+
+
+def new_extractor(backend='stdlib'):
+    if backend == 'lxml' and etree is None:
+        raise ImportError('The lxml link extractor requires lxml: pip3 install lxml')
+    return BACKENDS[backend]()
+
+
+def extract_links(html, backend='stdlib'):
+    extractor = new_extractor(backend)
+    extractor.feed(html)
+    return extractor.close()
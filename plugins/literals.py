@@ -0,0 +1,149 @@
+import re
+
+
+class LiteralExtractor:
+    """Linear-time replacement for the Analysis.REG_O and REG_L regexes.
+
+    Finds `key: {k: v, ...}` / `key = {...}` objects and `key: [a, b]` /
+    `key = [...]` lists with exactly the matches re.findall(REG_O) and
+    re.findall(REG_L) return, without their catastrophic backtracking on
+    long identifier runs.
+
+    Every candidate bracket is located with a simple regex, its key is read
+    backwards and its body is run through a small automaton up to the first
+    closing bracket. Bodies never contain an opening bracket, so no
+    character is visited by more than one body scan.
+    """
+
+    KEY_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-')
+    VALUE_CHARS = KEY_CHARS | frozenset('/\\')
+    QUOTES = ('"', "'")
+
+    _RE_OPEN = re.compile(r'[:=]\s*([{\[])')
+    _RE_KEY_RUN = re.compile(r'[a-zA-Z0-9_\-]+')
+
+    # Character classes used by the body automata.
+    KEY, VALUE, DQ, SQ, WS, COLON, COMMA, CLOSE, OTHER = range(9)
+
+    # Object body: (key \s* : \s* value \s* ,? \s*)+ followed by '}'.
+    # States: 0 item start, 1/2 key in "..."/'...', 3 bare key, 4 after key,
+    # 5 after colon, 6/7 value in "..."/'...', 8 bare value,
+    # 9 after value, 10 after comma.
+    OBJECT_TRANSITIONS = {
+        0: {DQ: (1,), SQ: (2,), KEY: (3,)},
+        1: {KEY: (1,), DQ: (4,)},
+        2: {KEY: (2,), SQ: (4,)},
+        3: {KEY: (3,), WS: (4,), COLON: (5,)},
+        4: {WS: (4,), COLON: (5,)},
+        5: {WS: (5,), DQ: (6,), SQ: (7,), KEY: (8,), VALUE: (8,)},
+        6: {KEY: (6,), VALUE: (6,), DQ: (9,)},
+        7: {KEY: (7,), VALUE: (7,), SQ: (9,)},
+        # A bare value may be directly followed by the next bare key.
+        8: {KEY: (8, 3), VALUE: (8,), WS: (9,), COMMA: (10,), DQ: (1,), SQ: (2,)},
+        9: {WS: (9,), COMMA: (10,), DQ: (1,), SQ: (2,), KEY: (3,)},
+        10: {WS: (10,), DQ: (1,), SQ: (2,), KEY: (3,)}
+    }
+    OBJECT_FINAL = frozenset((8, 9, 10))
+
+    # List body: (item \s* ,? \s*)+ followed by ']'.
+    # States: 0 item start, 1/2 item in "..."/'...', 3 bare item,
+    # 4 after item, 5 after comma.
+    LIST_TRANSITIONS = {
+        0: {DQ: (1,), SQ: (2,), KEY: (3,)},
+        1: {KEY: (1,), DQ: (4,)},
+        2: {KEY: (2,), SQ: (4,)},
+        3: {KEY: (3,), WS: (4,), COMMA: (5,), DQ: (1,), SQ: (2,)},
+        4: {WS: (4,), COMMA: (5,), DQ: (1,), SQ: (2,), KEY: (3,)},
+        5: {WS: (5,), DQ: (1,), SQ: (2,), KEY: (3,)}
+    }
+    LIST_FINAL = frozenset((3, 4, 5))
+
+    def __init__(self):
+        self.object_dfa = {}
+        self.list_dfa = {}
+
+    def __class(self, ch, close):
+        if ch in self.KEY_CHARS:
+            return self.KEY
+        if ch in self.VALUE_CHARS:
+            return self.VALUE
+        if ch == '"':
+            return self.DQ
+        if ch == "'":
+            return self.SQ
+        if ch == close:
+            return self.CLOSE
+        if ch == ':':
+            return self.COLON
+        if ch == ',':
+            return self.COMMA
+        if ch.isspace():
+            return self.WS
+        return self.OTHER
+
+    def __step(self, cache, transitions, states, cls):
+        # Subset construction on demand: each (state set, class) pair is
+        # computed once and reused.
+        key = (states, cls)
+        nxt = cache.get(key)
+        if nxt is None:
+            nxt = cache[key] = frozenset(
+                s for state in states for s in transitions[state].get(cls, ()))
+        return nxt
+
+    def __body_end(self, js, pos, close):
+        """Index of the closing bracket if the body starting at pos is valid, else -1."""
+        if close == '}':
+            cache, transitions, final = self.object_dfa, self.OBJECT_TRANSITIONS, self.OBJECT_FINAL
+        else:
+            cache, transitions, final = self.list_dfa, self.LIST_TRANSITIONS, self.LIST_FINAL
+        states = frozenset((0,))
+        i = pos
+        while i < len(js):
+            cls = self.__class(js[i], close)
+            if cls == self.CLOSE:
+                return i if states & final else -1
+            nxt = self.__step(cache, transitions, states, cls)
+            if not nxt:
+                return -1
+            if cls == self.KEY and nxt == states:
+                # The rest of this identifier run cannot change the states.
+                i = self._RE_KEY_RUN.match(js, i).end()
+            else:
+                i += 1
+            states = nxt
+        return -1
+
+    def __key_start(self, js, end):
+        """Start of the key ending right before index end, or -1."""
+        k = end - 1
+        while k >= 0 and js[k].isspace():
+            k -= 1
+        if k < 0:
+            return -1
+        ch = js[k]
+        if ch in self.QUOTES:
+            j = k - 1
+            while j >= 0 and js[j] in self.KEY_CHARS:
+                j -= 1
+            return j if j >= 0 and js[j] == ch else -1
+        if ch in self.KEY_CHARS:
+            j = k
+            while j > 0 and js[j - 1] in self.KEY_CHARS:
+                j -= 1
+            return j
+        return -1
+
+    def extract(self, js):
+        """Return the object matches followed by the list matches."""
+        objects, lists = [], []
+        for m in self._RE_OPEN.finditer(js):
+            start = self.__key_start(js, m.start())
+            if start < 0:
+                continue
+            bracket = m.start(1)
+            close = '}' if js[bracket] == '{' else ']'
+            end = self.__body_end(js, bracket + 1, close)
+            if end >= 0:
+                (objects if close == '}' else lists).append(js[start:end + 1])
+        return objects + lists
@@ -0,0 +1,97 @@
+import os
+import re
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'utils')
+
+
+def data_file(name):
+    """Path of a bundled data file, independent of the working directory."""
+    return os.path.join(DATA_DIR, name)
+
+
+def read_lines(path):
+    with open(path, encoding='utf-8', errors='ignore') as f:
+        return f.read().splitlines()
+
+
+class IgnoreList:
+    """Set of ignored path candidates with optional '*' wildcard entries.
+
+    Plain entries are looked up in a set. Entries containing '*' (never part
+    of a real candidate, see Analysis.BAD_CHARS) match any run of characters
+    there, e.g. 'webpack://*' ignores a whole prefix. They are compiled
+    into a single regex.
+    """
+
+    def __init__(self, entries):
+        self.exact = set()
+        wildcards = []
+        for entry in entries:
+            if '*' in entry:
+                wildcards.append('.*'.join(re.escape(part) for part in entry.split('*')))
+            elif entry:
+                self.exact.add(entry)
+        self.wildcard = re.compile(f'(?:{"|".join(wildcards)})\\Z', re.DOTALL) if wildcards else None
+
+    @classmethod
+    def from_files(cls, *paths):
+        entries = []
+        for path in paths:
+            entries.extend(read_lines(path))
+        return cls(entries)
+
+    def __contains__(self, entry):
+        return entry in self.exact or (
+            self.wildcard is not None and self.wildcard.match(entry) is not None)
+
+
+class PathClassifier:
+    """Ordered keyword rules that assign a category to each extracted path.
+
+    All keywords are compiled into one zero-width alternation, so a path is
+    lower-cased once and scanned once. Alternatives are listed in rule
+    order, which keeps the precedence of the first matching rule.
+    """
+
+    FALLBACK = 'Not Classified'
+
+    def __init__(self, rules):
+        self.categories = []
+        self.owners = {}
+        for category, keywords in rules:
+            self.categories.append(category)
+            for keyword in keywords:
+                self.owners.setdefault(keyword.lower(), len(self.categories) - 1)
+        # Dict order is rule order, so on a shared offset the earlier rule wins.
+        self.matcher = re.compile(
+            '(?=(' + '|'.join(re.escape(k) for k in self.owners) + '))')
+
+    @staticmethod
+    def read_rules(path):
+        rules = []
+        for line in read_lines(path):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            category, _, keywords = line.partition(':')
+            keywords = [k.strip() for k in keywords.split(',') if k.strip()]
+            if not keywords:
+                raise ValueError(f'Path rule without keywords in {path}: {line}')
+            rules.append((category.strip(), keywords))
+        return rules
+
+    @classmethod
+    def from_files(cls, *paths):
+        rules = []
+        for path in paths:
+            rules.extend(cls.read_rules(path))
+        return cls(rules)
+
+    def classify(self, path):
+        best = len(self.categories)
+        for m in self.matcher.finditer(path.lower()):
+            best = min(best, self.owners[m.group(1)])
+            if not best:
+                break
+        return self.categories[best] if best < len(self.categories) else self.FALLBACK
@@ -0,0 +1,261 @@
+from collections import deque
+import os
+import re
+
+from plugins.literals import LiteralExtractor
+from plugins.tokenizer import StringTokenizer
+
+
+def usable_cpus():
+    """CPUs this process may run on, which can be fewer than os.cpu_count()."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class Scanner:
+    """Runs all Analysis detectors over a JS source in as few passes as possible.
+
+    Every detector is compiled once. Detectors that need a literal (the
+    secret prefixes, the TODO markers) are skipped without scanning when it
+    is absent, emails are matched outwards from each '@' instead of trying
+    every offset, and object and list literals come from the linear-time
+    LiteralExtractor.
+    """
+
+    EMAIL_LOCAL_CHARS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-'
+    TODO_MARKERS = ('TODO', 'FIXME', 'HACK', 'XXX')
+
+    # No finding contains one of these, except a TODO comment running on
+    # past it (see safe_cut).
+    CUT_CHARS = (';', '(', ')')
+
+    def __init__(self, secrets, email, ip, todo, sinks, interpolation):
+        # secrets: ((label, required literal, pattern), ...)
+        self.secrets = [
+            (label, literal, re.compile(pattern)) for label, literal, pattern in secrets]
+        # The local part of the email pattern must be [EMAIL_LOCAL_CHARS]+
+        self.email_domain = re.compile('@' + email.split('@', 1)[1])
+        self.ip = re.compile(ip)
+        self.todo = re.compile(todo)
+        self.sinks = re.compile(sinks)
+        self.literals = LiteralExtractor()
+        self.interpolation = interpolation
+
+    def __emails(self, js):
+        emails = []
+        end = 0
+        at = js.find('@')
+        while at != -1:
+            # Walk left over the local part, never into the previous match.
+            start = at
+            window = 64
+            while start > end:
+                lo = max(end, start - window)
+                chunk = js[lo:start]
+                kept = chunk.rstrip(self.EMAIL_LOCAL_CHARS)
+                start = lo + len(kept)
+                if kept:
+                    break
+                window *= 2
+            m = self.email_domain.match(js, at) if start < at else None
+            if m:
+                emails.append(js[start:m.end()])
+                end = m.end()
+                at = js.find('@', end)
+            else:
+                at = js.find('@', at + 1)
+        return emails
+
+    def clean_string(self, raw):
+        """String literal contents with template interpolations removed."""
+        if '${' in raw:
+            raw = self.interpolation.sub('', raw)
+        return raw.strip()
+
+    def safe_cut(self, js, start=0, end=None, chars=CUT_CHARS):
+        """Index after the last cut char in js[start:end] that no finding can span, or 0.
+
+        Scanning js[:i] and js[i:] separately then finds exactly what a scan
+        of js does. A TODO comment is the only finding that can contain a
+        cut char, and it can only do so after a marker on the same line.
+        start must itself be 0 or such a cut.
+        """
+        end = len(js) if end is None else end
+        while end > start:
+            cut = max(js.rfind(c, start, end) for c in chars)
+            if cut < 0:
+                return 0
+            line = max(start, js.rfind('\n', start, cut) + 1)
+            markers = [i for i in (js.find(m, line, cut) for m in self.TODO_MARKERS) if i >= 0]
+            if not markers:
+                return cut + 1
+            end = min(markers)
+        return 0
+
+    def stream(self, pool=None, split_size=None):
+        return ScanStream(self, pool, split_size)
+
+    def scan(self, js):
+        secrets = []
+        for label, literal, pattern in self.secrets:
+            if literal in js:
+                secrets.extend(f'{label}: {x}' for x in pattern.findall(js))
+        return {
+            'secrets': secrets,
+            'emails': self.__emails(js) if '@' in js else [],
+            'ips': self.ip.findall(js),
+            'comments': (
+                self.todo.findall(js)
+                if '//' in js and any(marker in js for marker in self.TODO_MARKERS)
+                else []),
+            'sinks': self.sinks.findall(js),
+            'objects': self.literals.extract(js)
+        }
+
+
+class ScanStream:
+    """Scanner run over a source that arrives in chunks.
+
+    String literals go through a StringTokenizer as each chunk arrives.
+    The other detectors run over windows of about WINDOW characters that
+    end at a Scanner.safe_cut, so only one window is held at a time. A
+    window without any safe cut keeps growing up to MAX_WINDOW and is then
+    split where it is.
+
+    A source shorter than split_size is scanned in one pass when it closes.
+    With a process pool, everything after the first split_size characters
+    is cut into SEGMENT sized pieces that end at a ';' and scanned by the
+    workers, up to two per CPU at a time. A worker tokenizes its segment
+    as if it started in code, which holds whenever the tokenizer of the
+    previous segment ends in code. Segments are merged in order and one
+    whose guess was wrong is tokenized again here, so the result is the
+    same as a scan in one pass.
+    """
+
+    WINDOW = 1 << 20
+    MAX_WINDOW = 16 << 20
+    SEGMENT = 1 << 20
+    SPLIT_SIZE = 4 << 20
+
+    def __init__(self, scanner, pool=None, split_size=None):
+        self.scanner = scanner
+        self.tokenizer = StringTokenizer()
+        self.pending = []
+        self.size = 0
+        self.found = {k: [] for k in ('secrets', 'emails', 'ips', 'comments', 'sinks', 'objects')}
+        self.pool = pool
+        self.split_size = self.SPLIT_SIZE if split_size is None else split_size
+        # Size at which the next cut is looked for.
+        self.limit = max(self.WINDOW, self.split_size)
+        self.depth = 2 * usable_cpus()
+        self.consumed = 0
+        self.parallel = False
+        # Characters at the start of pending the tokenizer has already read.
+        self.tokenized = None
+        # (text, trusted, future) of the segments handed to the pool, in order.
+        self.segments = deque()
+        self.after_semicolon = False
+
+    def __scan(self, js):
+        for k, v in self.scanner.scan(js).items():
+            self.found[k].extend(v)
+
+    def __submit(self, js):
+        if self.tokenized is not None:
+            # The first segment goes on from the real tokenizer state.
+            tokenizer, offset, trusted = self.tokenizer, self.tokenized, True
+            self.tokenized = None
+        else:
+            tokenizer, offset = StringTokenizer(), 0
+            tokenizer.before = ';'
+            # Only checked once the previous segment is merged.
+            trusted = None if self.after_semicolon else False
+        self.after_semicolon = js.endswith(';')
+        future = self.pool.submit(_scan_segment, self.scanner, js, tokenizer, offset)
+        self.segments.append((js, trusted, future))
+
+    def __collect(self, wait):
+        literals = []
+        while self.segments and (wait or len(self.segments) >= self.depth or self.segments[0][2].done()):
+            js, trusted, future = self.segments.popleft()
+            found, strings, tokenizer = future.result()
+            for k, v in found.items():
+                self.found[k].extend(v)
+            if trusted or (trusted is None and self.tokenizer.in_code()):
+                self.tokenizer = tokenizer
+            else:
+                strings = [self.scanner.clean_string(s) for s in self.tokenizer.feed(js)]
+            literals.extend(strings)
+        return literals
+
+    def __feed_segments(self, chunk):
+        self.pending.append(chunk)
+        self.size += len(chunk)
+        if self.size < self.SEGMENT:
+            return self.__collect(False)
+        js = ''.join(self.pending)
+        start = 0
+        while len(js) - start >= self.SEGMENT:
+            # The first segment has to cover what the tokenizer already read.
+            least = self.tokenized or 0
+            cut = self.scanner.safe_cut(js, start, max(start + self.SEGMENT, least + 1), (';',))
+            if cut < least:
+                cut = self.scanner.safe_cut(js, start, None, (';',))
+            if cut < least or not cut:
+                if len(js) - start < self.MAX_WINDOW:
+                    break
+                cut = len(js)
+            self.__submit(js[start:cut])
+            start = cut
+        js = js[start:]
+        self.pending = [js]
+        self.size = len(js)
+        return self.__collect(False)
+
+    def feed(self, chunk):
+        """Consume the next chunk, return the string literals completed so far."""
+        if self.pool is not None and self.consumed >= self.split_size:
+            if not self.parallel:
+                self.parallel = True
+                self.tokenized = self.size
+            return self.__feed_segments(chunk)
+        self.consumed += len(chunk)
+        self.pending.append(chunk)
+        self.size += len(chunk)
+        if self.size >= self.limit:
+            js = ''.join(self.pending)
+            cut = self.scanner.safe_cut(js)
+            if not cut and len(js) >= self.MAX_WINDOW:
+                cut = len(js)
+            if cut:
+                self.__scan(js[:cut])
+                js = js[cut:]
+            self.pending = [js]
+            self.size = len(js)
+            self.limit = self.size + self.WINDOW
+        return [self.scanner.clean_string(s) for s in self.tokenizer.feed(chunk)]
+
+    def close(self):
+        """Scan what is left.
+
+        Returns the findings in the layout of Scanner.scan and the string
+        literals not returned by feed yet.
+        """
+        js = ''.join(self.pending)
+        if self.parallel:
+            self.__submit(js)
+            literals = self.__collect(True)
+        else:
+            self.__scan(js)
+            literals = []
+        self.pending = []
+        self.size = 0
+        self.tokenizer.close()
+        return self.found, literals
+
+
+def _scan_segment(scanner, js, tokenizer, offset):
+    """Process pool entry point: Scanner.scan of a segment and its string literals."""
+    strings = [scanner.clean_string(s) for s in tokenizer.feed(js[offset:])]
+    return scanner.scan(js), strings, tokenizer
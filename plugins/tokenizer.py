@@ -0,0 +1,260 @@
+import re
+
+
+class StringTokenizer:
+    """Streaming tokenizer for the contents of JS string literals.
+
+    Source text is fed in chunks of any size and the literals completed by
+    each chunk are returned right away. Comments and regex literals are
+    skipped, `${...}` interpolations are left out of template literals and
+    a literal is dropped once it grows past MAX_LITERAL characters, so
+    memory use does not grow with the size of the source.
+
+    Whether a '/' starts a regex or is a division is decided from the
+    previous significant code character, the usual heuristic.
+    """
+
+    MAX_LITERAL = 4096
+    CONTEXT = 32
+
+    CODE, STRING, TEMPLATE, LINE_COMMENT, BLOCK_COMMENT, REGEX, REGEX_CLASS = range(7)
+
+    # Keywords after which a '/' starts a regex.
+    KEYWORDS = frozenset((
+        'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete',
+        'void', 'throw', 'case', 'do', 'else', 'yield', 'await'))
+
+    # Complete single-line strings are matched in one go, anything else
+    # goes through the state machine.
+    _STRINGS = r'"([^"\\\n]*(?:\\.[^"\\\n]*)*)"|\'([^\'\\\n]*(?:\\.[^\'\\\n]*)*)\'|'
+    _RE_CODE = re.compile(_STRINGS + r'["\'`/]', re.DOTALL)
+    _RE_CODE_EXPR = re.compile(_STRINGS + r'["\'`/{}]', re.DOTALL)
+    _RE_STRING = {'"': re.compile(r'["\\\n]'), "'": re.compile(r"['\\\n]")}
+    _RE_TEMPLATE = re.compile(r'[`\\$]')
+    _RE_REGEX = re.compile(r'[/\\\[\n]')
+    _RE_REGEX_CLASS = re.compile(r'[\]\\\n]')
+    _RE_WORD = re.compile(r'[\w$]+\Z')
+
+    def __init__(self):
+        self.state = self.CODE
+        self.quote = None
+        self.parts = []
+        self.size = 0
+        # Open template literals whose ${...} expression is being read:
+        # [parts, size, brace depth]
+        self.templates = []
+        # Last significant code characters before code_start, for the
+        # regex/division decision.
+        self.before = ''
+        self.code_start = 0
+        # At most one character that needs the next chunk to be understood.
+        self.carry = ''
+
+    def __remember(self, text):
+        text = text.rstrip()
+        if text:
+            self.before = (self.before + text)[-self.CONTEXT:]
+
+    def __regex_allowed(self, chunk, i):
+        before = chunk[max(self.code_start, i - self.CONTEXT):i].rstrip()
+        if i - self.CONTEXT < self.code_start:
+            before = self.before + before
+        if not before:
+            return True
+        ch = before[-1]
+        if ch in ')]"\'`':
+            return False
+        if ch == '$' or ch.isalnum() or ch == '_':
+            return self._RE_WORD.search(before).group() in self.KEYWORDS
+        return True
+
+    def __start_literal(self, state, quote=None):
+        self.state = state
+        self.quote = quote
+        self.parts = []
+        self.size = 0
+
+    def __append(self, text):
+        if self.size <= self.MAX_LITERAL:
+            self.parts.append(text)
+        self.size += len(text)
+        if self.size > self.MAX_LITERAL:
+            self.parts = []
+
+    def __end_literal(self, found):
+        if self.size <= self.MAX_LITERAL:
+            found.append(''.join(self.parts))
+        self.parts = []
+        self.size = 0
+        self.before = self.quote or '`'
+
+    def __resume_code(self, pos):
+        self.state = self.CODE
+        self.code_start = pos
+        return pos
+
+    def __code(self, chunk, pos, found):
+        search = (self._RE_CODE_EXPR if self.templates else self._RE_CODE).search
+        m = search(chunk, pos)
+        while m and m.lastindex:
+            literal = m.group(m.lastindex)
+            if len(literal) <= self.MAX_LITERAL:
+                found.append(literal)
+            self.before = '"' if m.lastindex == 1 else "'"
+            self.code_start = m.end()
+            m = search(chunk, self.code_start)
+        if not m:
+            return len(chunk)
+        i = m.start()
+        ch = chunk[i]
+        if ch == '/':
+            if i + 1 == len(chunk):
+                self.__remember(chunk[max(self.code_start, i - self.CONTEXT):i])
+                self.carry = '/'
+                return len(chunk)
+            nxt = chunk[i + 1]
+            if nxt == '/' or nxt == '*':
+                self.__remember(chunk[max(self.code_start, i - self.CONTEXT):i])
+                self.state = self.LINE_COMMENT if nxt == '/' else self.BLOCK_COMMENT
+                return i + 2
+            if self.__regex_allowed(chunk, i):
+                self.__remember(chunk[max(self.code_start, i - self.CONTEXT):i])
+                self.state = self.REGEX
+            return i + 1
+        if ch == '{':
+            self.templates[-1][2] += 1
+        elif ch == '}':
+            frame = self.templates[-1]
+            if frame[2]:
+                frame[2] -= 1
+            else:
+                # End of a ${...} expression, back inside the template.
+                self.templates.pop()
+                self.parts, self.size = frame[0], frame[1]
+                self.quote = None
+                self.state = self.TEMPLATE
+        elif ch == '`':
+            self.__start_literal(self.TEMPLATE)
+        else:
+            self.__start_literal(self.STRING, ch)
+        return i + 1
+
+    def __string(self, chunk, pos, found):
+        m = self._RE_STRING[self.quote].search(chunk, pos)
+        if not m:
+            self.__append(chunk[pos:])
+            return len(chunk)
+        i = m.start()
+        ch = chunk[i]
+        if ch == '\\':
+            if i + 1 == len(chunk):
+                self.__append(chunk[pos:i])
+                self.carry = '\\'
+                return len(chunk)
+            self.__append(chunk[pos:i + 2])
+            return i + 2
+        if ch == '\n':
+            # Unterminated string, not a literal after all.
+            self.parts = []
+            self.size = 0
+            return self.__resume_code(i)
+        self.__append(chunk[pos:i])
+        self.__end_literal(found)
+        return self.__resume_code(i + 1)
+
+    def __template(self, chunk, pos, found):
+        m = self._RE_TEMPLATE.search(chunk, pos)
+        if not m:
+            self.__append(chunk[pos:])
+            return len(chunk)
+        i = m.start()
+        ch = chunk[i]
+        if ch == '`':
+            self.__append(chunk[pos:i])
+            self.__end_literal(found)
+            return self.__resume_code(i + 1)
+        if i + 1 == len(chunk):
+            self.__append(chunk[pos:i])
+            self.carry = ch
+            return len(chunk)
+        if ch == '\\':
+            self.__append(chunk[pos:i + 2])
+            return i + 2
+        self.__append(chunk[pos:i])
+        if chunk[i + 1] != '{':
+            self.__append('$')
+            return i + 1
+        self.templates.append([self.parts, self.size, 0])
+        self.parts = []
+        self.size = 0
+        self.before = '{'
+        return self.__resume_code(i + 2)
+
+    def __line_comment(self, chunk, pos, found):
+        i = chunk.find('\n', pos)
+        if i == -1:
+            return len(chunk)
+        return self.__resume_code(i)
+
+    def __block_comment(self, chunk, pos, found):
+        i = chunk.find('*/', pos)
+        if i == -1:
+            if chunk.endswith('*'):
+                self.carry = '*'
+            return len(chunk)
+        return self.__resume_code(i + 2)
+
+    def __regex(self, chunk, pos, found):
+        in_class = self.state == self.REGEX_CLASS
+        m = (self._RE_REGEX_CLASS if in_class else self._RE_REGEX).search(chunk, pos)
+        if not m:
+            return len(chunk)
+        i = m.start()
+        ch = chunk[i]
+        if ch == '\\':
+            if i + 1 == len(chunk):
+                self.carry = '\\'
+                return len(chunk)
+            return i + 2
+        if ch == '\n':
+            # Not a regex after all, carry on with the next line as code.
+            return self.__resume_code(i)
+        if ch == '[':
+            self.state = self.REGEX_CLASS
+        elif ch == ']':
+            self.state = self.REGEX
+        else:
+            self.before = ')'
+            return self.__resume_code(i + 1)
+        return i + 1
+
+    def in_code(self):
+        """True between tokens, outside of any template literal."""
+        return self.state == self.CODE and not self.templates and not self.carry
+
+    def feed(self, chunk):
+        """Consume the next chunk of source, return the literals it completed."""
+        if self.carry:
+            chunk = self.carry + chunk
+            self.carry = ''
+        handlers = {
+            self.CODE: self.__code,
+            self.STRING: self.__string,
+            self.TEMPLATE: self.__template,
+            self.LINE_COMMENT: self.__line_comment,
+            self.BLOCK_COMMENT: self.__block_comment,
+            self.REGEX: self.__regex,
+            self.REGEX_CLASS: self.__regex
+        }
+        found = []
+        pos = self.code_start = 0
+        while pos < len(chunk) and not self.carry:
+            pos = handlers[self.state](chunk, pos, found)
+        if self.state == self.CODE and not self.carry:
+            self.__remember(chunk[max(self.code_start, len(chunk) - self.CONTEXT):])
+        return found
+
+    def close(self):
+        """Finish the source. Unterminated literals are dropped."""
+        self.__init__()
+        return []
@@ -0,0 +1,8 @@
+(self.webpackChunkapp=self.webpackChunkapp||[]).push([[179],{8255:function(e,t,n){"use strict";
+var r=n(4942),o={baseURL:"/api",withCredentials:true},i=["GET","POST","PUT","DELETE"];
+const a={login:"/auth/login",register:"/auth/register",reset:"/auth/password-reset"};
+function s(e){return fetch(o.baseURL+e,{method:"GET",credentials:"include"})}
+var c={USER_ROLE:"ROLE_USER",ADMIN_ROLE:"ROLE_ADMIN"},u=[c,a];
+t.default={name:"app",version:"1.4.2",features:["sso","mfa","audit"]};
+e.exports={session:{cookie:"sid",maxAge:3600},allowed:[admin,editor]};
+},4942:function(e,t,n){var l={},d=[];l["key"]={a:1};d.push([1,2,3]);}}]);
@@ -0,0 +1,28 @@
+a:{b:c d:e}
+a:{b:c"d":e}
+a:{b:"c"'d':e}
+key = {k:v}} = {x:y}
+x:{y:{z:1}}
+x:[y:[1,2]]
+x = {a:1, b:[1,2], c:3}
+x = {a:"unterminated}
+x = {a: "has space"}
+x = {a:b/c\d}
+x = ["a/b"]
+"": {"": ""}
+'': ['']
+-_-: {_: -}
+obj.prop = {a:1}
+fn({a:1}, [b, c])
+a : = {b:c}
+a:
+{b:c}
+a	:	[	b	,	c	]
+ok: {a:1} bad: {a:@} ok2: [b]
+x:{a:bc:d}
+x = {key:valuekey2:value2, k3:v3}
+x = {a:b/c:d}
+x = {a:1,}
+x = {a:1, }
+x = [a"b"'c']
+x = [a'b']
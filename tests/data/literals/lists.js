@@ -0,0 +1,8 @@
+var roles = ["admin", "user", "guest"];
+const ids = [1, 2, 3, 42];
+scopes: ['read', 'write' , 'delete',]
+var mixed = ["a" 'b' c "d"];
+let tags=[alpha beta gamma];
+var empty = [];
+var nested = [[1, 2], [3, 4]];
+permissions = [ "users:read" ];
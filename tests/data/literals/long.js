@@ -0,0 +1,4 @@
+var aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa = {bbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb: cccccccccccccccccccccccccccccccccccc};
+var list = [aaaaaaaaaaaaaaaaaaaa bbbbbbbbbbbbbbbbbbbb cccccccccccccccccccc];
+var x = {a:bcdefghijklmnopqrstuvwxyzabcdefghijklmnopq rstuvwxyz:1};
+var y = {a:bcdefghijklmnopqrstuvwxyzabcdefghijklmnopqrstuvwxyz;
@@ -0,0 +1,10 @@
+var config = {apiUrl: "/api/v1", timeout: 3000, retries: 3};
+const headers = {'Content-Type': 'application/json', "X-Requested-With": 'XMLHttpRequest'};
+let routes={home:"/",login:'/auth/login',logout:/auth/logout};
+settings: { debug: false, level: info , }
+"quoted-key" = {a:1,b:2}
+'single' : {x:"y"}
+window.env = {NODE_ENV: "production", PUBLIC_PATH: "/static/"};
+var paths = {root: "C:\\app\\root", unix: "/usr/local/bin"};
+var empty = {};
+var spaced = {   key   :   value   ,   other   :   "v"   };
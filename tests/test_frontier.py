@@ -0,0 +1,105 @@
+from collections import Counter
+import os
+from threading import Barrier, Lock, Thread
+
+from mixins.frontier import Frontier
+from mixins.visited import VisitedIndex
+
+THREADS = 200
+PAGES = 5000
+
+
+def links(page):
+    """Every page links to a few others, most of them linked from elsewhere too."""
+    return [f'http://example.com/{(page * k + 1) % PAGES}' for k in (2, 3, 7)]
+
+
+def run_threads(target):
+    threads = [Thread(target=target) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    assert not any(thread.is_alive() for thread in threads)
+
+
+def test_concurrent_add_queues_once():
+    frontier = Frontier()
+    barrier = Barrier(THREADS)
+    results = []
+
+    def add():
+        barrier.wait()
+        results.append(frontier.add('http://example.com/'))
+
+    run_threads(add)
+    assert results.count(True) == 1
+    assert len(frontier) == 1
+
+
+def test_claim_done_until_exhausted():
+    frontier = Frontier(canonicalize=lambda url: url.rstrip('/'))
+    frontier.add('http://example.com/0')
+    claimed = Counter()
+    lock = Lock()
+
+    def worker():
+        while True:
+            url = frontier.claim()
+            if url is None:
+                return
+            with lock:
+                claimed[url] += 1
+            for link in links(int(url.rsplit('/', 1)[1])):
+                # Spellings that only differ after canonicalize are not queued again.
+                frontier.add(link)
+                frontier.add(link + '/')
+            frontier.done(url)
+
+    run_threads(worker)
+    reachable, todo = {0}, [0]
+    while todo:
+        for link in links(todo.pop()):
+            page = int(link.rsplit('/', 1)[1])
+            if page not in reachable:
+                reachable.add(page)
+                todo.append(page)
+    assert set(claimed) == {f'http://example.com/{page}' for page in reachable}
+    assert max(claimed.values()) == 1
+    assert frontier.in_flight == 0 and not len(frontier)
+    assert frontier.claim() is None
+
+
+def test_stop_releases_waiting_threads():
+    frontier = Frontier()
+    frontier.add('http://example.com/')
+    assert frontier.claim() == 'http://example.com/'
+    returned = []
+
+    def worker():
+        returned.append(frontier.claim())
+
+    threads = [Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    frontier.stop()
+    for thread in threads:
+        thread.join(30)
+    assert returned == [None] * THREADS
+
+
+def test_restore_closes_replaced_index():
+    class SmallIndex(VisitedIndex):
+        RECENT = 1 << 10
+
+    index = SmallIndex(max_memory=16 << 10)
+    frontier = Frontier(index)
+    for i in range(5000):
+        frontier.add(f'http://example.com/{i}')
+    spill_dir = index.spill_dir
+    assert os.listdir(spill_dir)
+    visited = VisitedIndex()
+    frontier.restore(['http://example.com/a'], visited)
+    assert not os.path.exists(spill_dir)
+    assert frontier.seen is visited and len(frontier) == 1
+    visited.close()
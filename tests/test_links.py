@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from plugins.links import etree, extract_links, new_extractor
+
+PAGES = os.path.join(os.path.dirname(__file__), 'data', 'pages')
+WELLFORMED = sorted(os.path.join(PAGES, 'wellformed', name) for name in os.listdir(os.path.join(PAGES, 'wellformed')))
+MALFORMED = sorted(os.path.join(PAGES, 'malformed', name) for name in os.listdir(os.path.join(PAGES, 'malformed')))
+
+
+def read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def fields(links):
+    return {
+        'hrefs': links.hrefs,
+        'scripts': links.scripts,
+        'forms': links.forms,
+        'preloads': links.preloads,
+        'import_maps': links.import_maps
+    }
+
+
+@pytest.mark.parametrize('path', WELLFORMED + MALFORMED, ids=os.path.basename)
+def test_stdlib_matches_bs4(path):
+    html = read(path)
+    assert fields(extract_links(html, 'stdlib')) == fields(extract_links(html, 'bs4'))
+
+
+@pytest.mark.skipif(etree is None, reason='lxml is not installed')
+@pytest.mark.parametrize('path', WELLFORMED, ids=os.path.basename)
+def test_lxml_matches_stdlib(path):
+    # libxml2 repairs broken markup its own way, only well-formed pages are compared.
+    html = read(path)
+    assert fields(extract_links(html, 'lxml')) == fields(extract_links(html, 'stdlib'))
+
+
+@pytest.mark.parametrize('backend', ['stdlib', 'bs4'] + (['lxml'] if etree is not None else []))
+@pytest.mark.parametrize('path', WELLFORMED, ids=os.path.basename)
+def test_fed_in_chunks(backend, path):
+    html = read(path)
+    extractor = new_extractor(backend)
+    for i in range(0, len(html), 7):
+        extractor.feed(html[i:i + 7])
+    assert fields(extractor.close()) == fields(extract_links(html, backend))
+
+
+def test_basic_page():
+    links = extract_links(read(os.path.join(PAGES, 'wellformed', 'basic.html')))
+    assert links.hrefs == [
+        '/', '/products/?page=2&sort=price', 'https://example.org/about', 'mailto:sales@example.com', None]
+    assert links.forms == ['/search', None]
+    assert links.scripts == [('/assets/app.js', '')]
+    assert links.preloads == ['/assets/vendor.js', '/assets/app.js']
+
+
+def test_lxml_missing():
+    if etree is not None:
+        pytest.skip('lxml is installed')
+    with pytest.raises(ImportError):
+        new_extractor('lxml')
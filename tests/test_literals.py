@@ -0,0 +1,39 @@
+import os
+import random
+import re
+
+import pytest
+
+from plugins.analysis import Analysis
+from plugins.literals import LiteralExtractor
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'data', 'literals')
+REG_O = re.compile(Analysis.REG_O)
+REG_L = re.compile(Analysis.REG_L)
+
+
+def reference(js):
+    return REG_O.findall(js) + REG_L.findall(js)
+
+
+@pytest.mark.parametrize('name', sorted(os.listdir(CORPUS)))
+def test_corpus_matches_regexes(name):
+    with open(os.path.join(CORPUS, name), encoding='utf-8') as f:
+        js = f.read()
+    expected = reference(js)
+    assert expected
+    assert LiteralExtractor().extract(js) == expected
+    # Line by line, with the automata already built by the whole file.
+    extractor = LiteralExtractor()
+    extractor.extract(js)
+    for line in js.splitlines():
+        assert extractor.extract(line) == reference(line)
+
+
+def test_random_snippets_match_regexes():
+    rng = random.Random(0)
+    alphabet = 'ab_-1 :=,{}[]"\'/\\\n\tx;'
+    extractor = LiteralExtractor()
+    for _ in range(20000):
+        js = ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 25)))
+        assert extractor.extract(js) == reference(js), repr(js)
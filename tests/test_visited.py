@@ -0,0 +1,28 @@
+import os
+
+from mixins.visited import VisitedIndex
+
+
+class SmallIndex(VisitedIndex):
+    RECENT = 1 << 10
+    MERGE_BLOCK = 100
+
+
+def test_spilled_runs_are_merged():
+    index = SmallIndex(max_memory=16 << 10)
+    urls = [f'http://example.com/{i}' for i in range(100000)]
+    try:
+        for url in urls:
+            assert index.add(url)
+        files = os.listdir(index.spill_dir)
+        # One file per set bit of the number of spilled runs, at most.
+        assert 0 < len(files) == len(index.spilled) <= 7
+        for _, _, run in index.spilled:
+            assert all(run[i] < run[i + 1] for i in range(len(run) - 1))
+        assert all(url in index for url in urls[::7])
+        assert not any(f'http://example.org/{i}' in index for i in range(10000))
+        assert not index.add(urls[0]) and len(index) == len(urls)
+    finally:
+        spill_dir = index.spill_dir
+        index.close()
+    assert not os.path.exists(spill_dir)